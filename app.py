@@ -8,16 +8,27 @@ to fresh food sources by mapping grocery store locations.
 import streamlit as st
 import pandas as pd
 import geopandas as gpd
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+import atexit
+import copy
 import logging
-from datetime import datetime
+import queue
+from logging.handlers import QueueHandler, QueueListener
+import time
 
 # Import modules
+# db_setup (psycopg2/SQLAlchemy), utils.map_builder (folium) and
+# streamlit_folium are imported where they are used, so the welcome
+# screen renders without loading them.
 from config import Config
 from city_fetcher import (
     fetch_city_boundary, 
     get_boundary_info, 
     validate_boundary,
-    US_STATES
+    simplify_boundary,
+    US_STATES,
+    US_STATE_INDEX
 )
 from grocery_fetcher import (
     fetch_grocery_stores,
@@ -27,24 +38,219 @@ from grocery_fetcher import (
     filter_stores_by_type,
     validate_stores
 )
-from db_setup import (
-    check_city_exists,
-    save_city_to_db,
-    save_stores_to_db,
-    get_city_from_db,
-    get_stores_from_db,
-    log_fetch_metadata
+from utils.validation import (
+    validate_city_name,
+    validate_state_name,
+    validate_coordinates,
+    sanitize_input
 )
-from utils.validation import validate_city_name, validate_state_name, sanitize_input
-from utils.map_builder import create_full_map
-from utils.geo_utils import find_nearest_store, count_stores_in_radius, buffer_geometry, calculate_distance
-from streamlit_folium import st_folium
+from utils.geo_utils import (
+    find_nearest_store,
+    find_stores_in_radius,
+    buffer_geometry,
+    downcast_numeric_columns
+)
+import shapely
 from shapely import Point
+from shapely.geometry import Polygon, MultiPolygon
+
+def configure_logging():
+    """
+    Route log records through a queue so logging calls never block on I/O.
+    
+    The handlers set up by logging.basicConfig are moved behind a
+    background QueueListener. Streamlit re-executes this script on every
+    interaction, so this only takes effect once per process.
+    """
+    root = logging.getLogger()
+    if any(isinstance(handler, QueueHandler) for handler in root.handlers):
+        return
+    
+    logging.basicConfig(level=logging.INFO)
+    
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *root.handlers, respect_handler_level=True)
+    root.handlers = [QueueHandler(log_queue)]
+    listener.start()
+    atexit.register(listener.stop)
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger(__name__)
 
+# ============================================================================
+# CACHED DATA ACCESS
+# ============================================================================
+# Streamlit re-executes this script on every interaction, so the slow OSM and
+# database lookups are memoized on primitive keys. GeoDataFrames are not
+# hashable, which is why stores are keyed on the boundary's WKB bytes.
+# OSM results are also persisted to disk so they survive a server restart;
+# the Re-fetch option clears them explicitly instead of relying on a TTL.
+
+@st.cache_data(show_spinner=False, persist=Config.OSM_CACHE_PERSIST, max_entries=Config.CACHE_MAX_ENTRIES)
+def _cached_boundary(city: str, state: str, country: str):
+    """Fetch a city boundary from OSM, memoized by (city, state, country)."""
+    return fetch_city_boundary(city, state, country)
+
+@st.cache_data(show_spinner=False, persist=Config.OSM_CACHE_PERSIST, max_entries=Config.CACHE_MAX_ENTRIES)
+def _cached_stores(boundary_wkb: bytes):
+    """Fetch grocery stores from OSM, memoized by the boundary geometry."""
+    boundary_gdf = gpd.GeoDataFrame(
+        geometry=gpd.GeoSeries.from_wkb([boundary_wkb]),
+        crs='EPSG:4326'
+    )
+    return fetch_grocery_stores(boundary_gdf)
+
+@st.cache_data(show_spinner=False, ttl=Config.CITY_LOOKUP_TTL, max_entries=Config.CACHE_MAX_ENTRIES)
+def _cached_city_exists(city: str, state: str, country: str):
+    """
+    Look up a city in the database, memoized by its lowercased name.
+    
+    The lookup is case-insensitive, so callers pass lowercased values and
+    equivalent spellings share one cache entry.
+    """
+    from db_setup import check_city_exists
+    
+    return check_city_exists(city, state, country)
+
+@st.cache_data(show_spinner=False, ttl=Config.CACHE_TTL, max_entries=Config.CACHE_MAX_ENTRIES)
+def _cached_city_from_db(city_id: int):
+    """Load a city boundary from the database, memoized by city ID."""
+    from db_setup import get_city_from_db
+    
+    return get_city_from_db(city_id)
+
+@st.cache_data(show_spinner=False, ttl=Config.CACHE_TTL, max_entries=Config.CACHE_MAX_ENTRIES)
+def _cached_stores_from_db(city_id: int):
+    """Load a city's stores from the database, memoized by city ID."""
+    from db_setup import get_stores_from_db
+    
+    return get_stores_from_db(city_id)
+
+@st.cache_data(show_spinner=False, ttl=Config.CACHE_TTL, max_entries=Config.CACHE_MAX_ENTRIES)
+def _boundary_geojson(city_key: tuple, _boundary_gdf: gpd.GeoDataFrame) -> str:
+    """Serialize a city's boundary to GeoJSON once, memoized by city."""
+    from utils.map_builder import boundary_to_geojson
+    
+    return boundary_to_geojson(_boundary_gdf)
+
+@st.cache_resource(show_spinner=False, max_entries=Config.MAP_CACHE_MAX_ENTRIES)
+def _build_map(
+    city_key: tuple,
+    selected_types: tuple,
+    analysis_point,
+    analysis_radius: float,
+    show_walkability: bool,
+    walkability_radius: float,
+    _boundary_gdf: gpd.GeoDataFrame,
+    _stores_gdf: gpd.GeoDataFrame
+):
+    """
+    Build the Folium map for the current view, memoized by its inputs.
+    
+    The cached map is shared by every session and folium adds another
+    copy of its scripts each time a map is rendered, so callers must
+    render a copy.deepcopy() of it, never the cached object itself. The
+    GeoDataFrames are excluded from hashing (leading underscore); the
+    city key identifies them instead.
+    """
+    from utils.map_builder import create_full_map
+    
+    if selected_types and _stores_gdf is not None and not _stores_gdf.empty:
+        filtered_stores = filter_stores_by_type(_stores_gdf, list(selected_types))
+    else:
+        filtered_stores = _stores_gdf
+    
+    # Prepare walkability buffers if enabled
+    walkability_gdf = None
+    if show_walkability and filtered_stores is not None and not filtered_stores.empty:
+        try:
+            walkability_gdf = buffer_geometry(
+                filtered_stores, 
+                walkability_radius * 1000  # Convert km to meters
+            )
+        except Exception as e:
+            logger.error(f"Error creating walkability buffers: {e}")
+    
+    boundary_geojson = None
+    if _boundary_gdf is not None and not _boundary_gdf.empty:
+        boundary_geojson = _boundary_geojson(city_key, _boundary_gdf)
+    
+    return create_full_map(
+        _boundary_gdf,
+        filtered_stores,
+        use_clusters=True,
+        add_legend=True,
+        analysis_point=analysis_point,
+        analysis_radius=analysis_radius,
+        walkability_gdf=walkability_gdf,
+        walkability_radius=walkability_radius,
+        boundary_geojson=boundary_geojson
+    )
+
+@st.cache_resource(show_spinner=False, max_entries=Config.MAP_CACHE_MAX_ENTRIES)
+def _build_map_html(
+    city_key: tuple,
+    selected_types: tuple,
+    analysis_point,
+    analysis_radius: float,
+    show_walkability: bool,
+    walkability_radius: float,
+    _boundary_gdf: gpd.GeoDataFrame,
+    _stores_gdf: gpd.GeoDataFrame
+) -> str:
+    """
+    Render the map for the current view to standalone HTML, memoized by its inputs.
+    
+    Rendering a city-sized map takes tens of milliseconds. A copy of the
+    cached map is rendered, since rendering a folium map appends duplicate
+    layer calls to it.
+    """
+    return copy.deepcopy(_build_map(
+        city_key,
+        selected_types,
+        analysis_point,
+        analysis_radius,
+        show_walkability,
+        walkability_radius,
+        _boundary_gdf,
+        _stores_gdf
+    )).get_root().render()
+
+@st.cache_resource(show_spinner=False, max_entries=Config.MAP_CACHE_MAX_ENTRIES)
+def _projected_city(
+    city_key: tuple,
+    _boundary_gdf: gpd.GeoDataFrame,
+    _stores_gdf: gpd.GeoDataFrame
+):
+    """Project a city's boundary and stores to its UTM zone, memoized by city."""
+    utm_crs = _boundary_gdf.estimate_utm_crs()
+    return _boundary_gdf.to_crs(utm_crs), _stores_gdf.to_crs(utm_crs)
+
+@st.cache_data(show_spinner=False, ttl=Config.CACHE_TTL, max_entries=Config.CACHE_MAX_ENTRIES)
+def _walkability_coverage(
+    city_key: tuple,
+    radius_km: float,
+    _boundary_gdf: gpd.GeoDataFrame,
+    _stores_gdf: gpd.GeoDataFrame
+) -> tuple:
+    """
+    Compute the walkable and total city area, memoized by city and distance.
+    
+    Buffers, union and intersection are all done in meters in the city's
+    UTM projection.
+    
+    Returns:
+        Tuple of (walkable area in km², city area in km²)
+    """
+    boundary_projected, stores_projected = _projected_city(city_key, _boundary_gdf, _stores_gdf)
+    
+    merged_buffers = shapely.unary_union(stores_projected.geometry.buffer(radius_km * 1000).values)
+    city_geom = boundary_projected.geometry.iloc[0]
+    covered_geom = merged_buffers.intersection(city_geom)
+    
+    return covered_geom.area / 1_000_000, city_geom.area / 1_000_000
+
 # Page configuration
 st.set_page_config(
     page_title=Config.APP_TITLE,
@@ -108,42 +314,43 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+# Initial value of every session state key the app reads
+SESSION_DEFAULTS = {
+    'boundary_gdf': None,
+    'boundary_display_gdf': None,
+    'stores_gdf': None,
+    'city_info': None,
+    'current_city': None,
+    'current_state': None,
+    'data_loaded': False,
+    'pending_city': None,
+    'pending_state': None,
+    'show_options': False,
+    'existing_city_id': None,
+    'existing_city_row': None,
+    'city_key': None,
+    'store_types': [],
+    'store_summary': None,
+    'analysis_point': None,
+    'show_analysis': False,
+    'analysis_radius': 1.0,
+    'show_walkability_buffers': False,
+    'walkability_radius': 1.0,
+    'input_method': "City Name",
+    'custom_location': None,
+}
+
 def initialize_session_state():
-    """Initialize session state variables."""
-    if 'boundary_gdf' not in st.session_state:
-        st.session_state.boundary_gdf = None
-    if 'stores_gdf' not in st.session_state:
-        st.session_state.stores_gdf = None
-    if 'city_info' not in st.session_state:
-        st.session_state.city_info = None
-    if 'current_city' not in st.session_state:
-        st.session_state.current_city = None
-    if 'current_state' not in st.session_state:
-        st.session_state.current_state = None
-    if 'data_loaded' not in st.session_state:
-        st.session_state.data_loaded = False
-    if 'pending_city' not in st.session_state:
-        st.session_state.pending_city = None
-    if 'pending_state' not in st.session_state:
-        st.session_state.pending_state = None
-    if 'show_options' not in st.session_state:
-        st.session_state.show_options = False
-    if 'existing_city_id' not in st.session_state:
-        st.session_state.existing_city_id = None
-    if 'analysis_point' not in st.session_state:
-        st.session_state.analysis_point = None
-    if 'show_analysis' not in st.session_state:
-        st.session_state.show_analysis = False
-    if 'analysis_radius' not in st.session_state:
-        st.session_state.analysis_radius = 1.0
-    if 'show_walkability_buffers' not in st.session_state:
-        st.session_state.show_walkability_buffers = False
-    if 'walkability_radius' not in st.session_state:
-        st.session_state.walkability_radius = 1.0
-    if 'input_method' not in st.session_state:
-        st.session_state.input_method = "City Name"
-    if 'custom_location' not in st.session_state:
-        st.session_state.custom_location = None
+    """Initialize session state variables once per session."""
+    ss = st.session_state
+    
+    if ss.get('_initialized'):
+        return
+    
+    for key, value in SESSION_DEFAULTS.items():
+        ss.setdefault(key, value)
+    
+    ss._initialized = True
 
 def render_header():
     """Render the application header."""
@@ -154,6 +361,8 @@ def render_header():
 
 def render_sidebar():
     """Render the sidebar with city selection."""
+    ss = st.session_state
+    
     st.sidebar.header("📍 Select a City")
     
     # Input method selection
@@ -164,7 +373,7 @@ def render_sidebar():
         horizontal=True,
         help="Choose how to specify the location"
     )
-    st.session_state.input_method = input_method
+    ss.input_method = input_method
     
     if input_method == "City Name":
         render_city_input()
@@ -172,16 +381,18 @@ def render_sidebar():
         render_coordinate_input()
     
     # Display current data info if loaded
-    if st.session_state.data_loaded and st.session_state.city_info:
+    info = ss.city_info
+    
+    if ss.data_loaded and info:
         st.sidebar.divider()
         st.sidebar.subheader("📊 Current Data")
         
-        info = st.session_state.city_info
         st.sidebar.markdown(f"**City:** {info['name']}, {info['state']}")
         st.sidebar.markdown(f"**Area:** {info['area_km2']:.2f} km²")
         
-        if st.session_state.stores_gdf is not None:
-            st.sidebar.markdown(f"**Stores:** {len(st.session_state.stores_gdf)}")
+        stores_gdf = ss.stores_gdf
+        if stores_gdf is not None:
+            st.sidebar.markdown(f"**Stores:** {len(stores_gdf)}")
         
         # Clear data button
         if st.sidebar.button("🗑️ Clear Data", width='stretch'):
@@ -190,23 +401,27 @@ def render_sidebar():
 
 def render_city_input():
     """Render city name input fields."""
-    # City input
-    city_input = st.sidebar.text_input(
-        "City Name",
-        value=st.session_state.current_city if st.session_state.current_city else "",
-        placeholder="e.g., Philadelphia"
-    )
+    ss = st.session_state
+    current_city, current_state = ss.current_city, ss.current_state
     
-    # State selection
-    state_input = st.sidebar.selectbox(
-        "State",
-        options=[""] + US_STATES,
-        index=US_STATES.index(st.session_state.current_state) + 1 
-            if st.session_state.current_state in US_STATES else 0
-    )
-    
-    # Fetch button
-    fetch_clicked = st.sidebar.button("🔍 Fetch City Data", type="primary", width='stretch')
+    # Inputs are submitted together, so editing them doesn't rerun the page
+    with st.sidebar.form("city_form", border=False):
+        # City input
+        city_input = st.text_input(
+            "City Name",
+            value=current_city if current_city else "",
+            placeholder="e.g., Philadelphia"
+        )
+        
+        # State selection
+        state_input = st.selectbox(
+            "State",
+            options=[""] + US_STATES,
+            index=US_STATE_INDEX.get(current_state, 0)
+        )
+        
+        # Fetch button
+        fetch_clicked = st.form_submit_button("🔍 Fetch City Data", type="primary", width='stretch')
     
     # Process fetch request
     if fetch_clicked:
@@ -227,32 +442,39 @@ def render_city_input():
                 return
             
             # Store pending city info
-            st.session_state.pending_city = city
-            st.session_state.pending_state = state
+            ss.pending_city = city
+            ss.pending_state = state
             
             # Check if city exists in database
-            existing_city = check_city_exists(city, state, Config.DEFAULT_COUNTRY)
+            lookup_key = (city.lower(), state.lower(), Config.DEFAULT_COUNTRY.lower())
+            existing_city = _cached_city_exists(*lookup_key)
+            
+            # None also means the lookup failed, so don't keep it cached
+            if existing_city is None:
+                _cached_city_exists.clear(*lookup_key)
             
             if existing_city:
-                # Show options
-                st.session_state.show_options = True
-                st.session_state.existing_city_id = existing_city['id']
+                # Show options (keep the row so the next rerun doesn't query again)
+                ss.show_options = True
+                ss.existing_city_id = existing_city['id']
+                ss.existing_city_row = existing_city
                 st.rerun()
             else:
                 # Fetch new data directly
-                st.session_state.show_options = False
+                ss.show_options = False
+                ss.existing_city_row = None
+                # Everything that shows the loaded city renders later in
+                # this run, so no extra rerun is needed
                 fetch_new_data(city, state)
-                st.session_state.current_city = city
-                st.session_state.current_state = state
-                st.rerun()
+                ss.current_city = city
+                ss.current_state = state
     
     # Show options if city exists in database
-    if st.session_state.show_options and st.session_state.existing_city_id:
-        existing_city = check_city_exists(
-            st.session_state.pending_city, 
-            st.session_state.pending_state, 
-            Config.DEFAULT_COUNTRY
-        )
+    existing_city_id = ss.existing_city_id
+    
+    if ss.show_options and existing_city_id:
+        existing_city = ss.existing_city_row
+        pending_city, pending_state = ss.pending_city, ss.pending_state
         
         if existing_city:
             st.sidebar.info(f"Found existing data from {existing_city['fetched_at'].strftime('%Y-%m-%d')}")
@@ -263,98 +485,87 @@ def render_city_input():
             re_fetch = col2.button("Re-fetch", width='stretch', key="re_fetch")
             
             if use_existing:
-                logger.info(f"Use Existing clicked for city_id: {st.session_state.existing_city_id}")
-                load_existing_data(st.session_state.existing_city_id)
-                st.session_state.current_city = st.session_state.pending_city
-                st.session_state.current_state = st.session_state.pending_state
-                st.session_state.show_options = False
-                st.session_state.existing_city_id = None
-                st.session_state.pending_city = None
-                st.session_state.pending_state = None
+                logger.info(f"Use Existing clicked for city_id: {existing_city_id}")
+                load_existing_data(existing_city_id)
+                ss.current_city = pending_city
+                ss.current_state = pending_state
+                ss.show_options = False
+                ss.existing_city_id = None
+                ss.existing_city_row = None
+                ss.pending_city = None
+                ss.pending_state = None
                 st.rerun()
             
             if re_fetch:
-                logger.info(f"Re-fetch clicked for: {st.session_state.pending_city}, {st.session_state.pending_state}")
-                fetch_new_data(st.session_state.pending_city, st.session_state.pending_state)
-                st.session_state.current_city = st.session_state.pending_city
-                st.session_state.current_state = st.session_state.pending_state
-                st.session_state.show_options = False
-                st.session_state.existing_city_id = None
-                st.session_state.pending_city = None
-                st.session_state.pending_state = None
+                logger.info(f"Re-fetch clicked for: {pending_city}, {pending_state}")
+                fetch_new_data(
+                    pending_city,
+                    pending_state,
+                    refresh=True
+                )
+                ss.current_city = pending_city
+                ss.current_state = pending_state
+                ss.show_options = False
+                ss.existing_city_id = None
+                ss.existing_city_row = None
+                ss.pending_city = None
+                ss.pending_state = None
                 st.rerun()
-    
-    # Display current data info if loaded
-    if st.session_state.data_loaded and st.session_state.city_info:
-        st.sidebar.divider()
-        st.sidebar.subheader("📊 Current Data")
-        
-        info = st.session_state.city_info
-        st.sidebar.markdown(f"**City:** {info['name']}, {info['state']}")
-        st.sidebar.markdown(f"**Area:** {info['area_km2']:.2f} km²")
-        
-        if st.session_state.stores_gdf is not None:
-            st.sidebar.markdown(f"**Stores:** {len(st.session_state.stores_gdf)}")
-        
-        # Clear data button
-        if st.sidebar.button("🗑️ Clear Data", width='stretch'):
-            clear_session_state()
-            st.rerun()
 
 def render_coordinate_input():
     """Render coordinate-based input fields."""
     st.sidebar.info("ℹ️ Enter coordinates to fetch data for a custom area")
     
-    # Latitude input
-    lat_input = st.sidebar.number_input(
-        "Latitude",
-        min_value=-90.0,
-        max_value=90.0,
-        value=39.9526 if st.session_state.custom_location is None else st.session_state.custom_location[0],
-        step=0.0001,
-        format="%.6f",
-        help="Latitude in decimal degrees (-90 to 90)"
-    )
-    
-    # Longitude input
-    lon_input = st.sidebar.number_input(
-        "Longitude",
-        min_value=-180.0,
-        max_value=180.0,
-        value=-75.1652 if st.session_state.custom_location is None else st.session_state.custom_location[1],
-        step=0.0001,
-        format="%.6f",
-        help="Longitude in decimal degrees (-180 to 180)"
-    )
-    
-    # Radius/buffer input for custom area
-    radius_km = st.sidebar.slider(
-        "Area Radius (km)",
-        min_value=1.0,
-        max_value=10.0,
-        value=3.0,
-        step=0.5,
-        help="Radius around the coordinates to fetch data"
-    )
-    
-    # Optional: Name for this custom location
-    location_name = st.sidebar.text_input(
-        "Location Name (optional)",
-        placeholder="e.g., My Neighborhood",
-        help="Give this location a custom name"
-    )
-    
-    # Fetch button
-    fetch_clicked = st.sidebar.button(
-        "🔍 Fetch Area Data", 
-        type="primary", 
-        use_container_width=True
-    )
-    
+    # Inputs are submitted together, so editing them doesn't rerun the page
+    with st.sidebar.form("coordinate_form", border=False):
+        # Latitude input
+        lat_input = st.number_input(
+            "Latitude",
+            min_value=-90.0,
+            max_value=90.0,
+            value=39.9526 if st.session_state.custom_location is None else st.session_state.custom_location[0],
+            step=0.0001,
+            format="%.6f",
+            help="Latitude in decimal degrees (-90 to 90)"
+        )
+        
+        # Longitude input
+        lon_input = st.number_input(
+            "Longitude",
+            min_value=-180.0,
+            max_value=180.0,
+            value=-75.1652 if st.session_state.custom_location is None else st.session_state.custom_location[1],
+            step=0.0001,
+            format="%.6f",
+            help="Longitude in decimal degrees (-180 to 180)"
+        )
+        
+        # Radius/buffer input for custom area
+        radius_km = st.slider(
+            "Area Radius (km)",
+            min_value=1.0,
+            max_value=10.0,
+            value=3.0,
+            step=0.5,
+            help="Radius around the coordinates to fetch data"
+        )
+        
+        # Optional: Name for this custom location
+        location_name = st.text_input(
+            "Location Name (optional)",
+            placeholder="e.g., My Neighborhood",
+            help="Give this location a custom name"
+        )
+        
+        # Fetch button
+        fetch_clicked = st.form_submit_button(
+            "🔍 Fetch Area Data", 
+            type="primary", 
+            width='stretch'
+        )
+        
     # Process fetch request
     if fetch_clicked:
-        from utils.validation import validate_coordinates
-        
         # Validate coordinates
         if not validate_coordinates(lat_input, lon_input):
             st.sidebar.error("Invalid coordinates")
@@ -364,8 +575,8 @@ def render_coordinate_input():
         st.session_state.custom_location = (lat_input, lon_input)
         
         # Fetch data for custom coordinates
+        # The loaded area renders later in this run, so no extra rerun is needed
         fetch_coordinate_data(lat_input, lon_input, radius_km, location_name)
-        st.rerun()
     
     # Display current custom location if loaded
     if st.session_state.data_loaded and st.session_state.custom_location:
@@ -399,7 +610,7 @@ def fetch_coordinate_data(
         radius_km: Radius around the point to search (in km)
         location_name: Optional custom name for the location
     """
-    start_time = datetime.now()
+    start_time = time.perf_counter()
 
     try:
         # Create a point geometry for the coordinates
@@ -453,9 +664,7 @@ def fetch_coordinate_data(
         st.sidebar.info("ℹ️ Custom coordinate data is not saved to database")
         
         # Update session state
-        st.session_state.boundary_gdf = boundary_gdf
-        st.session_state.stores_gdf = stores_gdf
-        st.session_state.city_info = {
+        store_city_data(boundary_gdf, stores_gdf, {
             'name': name,
             'state': 'Custom Location',
             'country': 'USA',
@@ -464,12 +673,11 @@ def fetch_coordinate_data(
             'bbox': boundary_gdf.total_bounds,
             'display_name': name,
             'place_type': 'custom'
-        }
-        st.session_state.data_loaded = True
+        })
         st.session_state.current_city = name
         st.session_state.current_state = 'Custom'
         
-        duration = (datetime.now() - start_time).total_seconds()
+        duration = time.perf_counter() - start_time
         logger.info(f"Fetched coordinate data in {duration:.2f} seconds")
         
     except Exception as e:
@@ -481,17 +689,19 @@ def load_existing_data(city_id: int):
     try:
         with st.spinner("Loading data from database..."):
             # Load boundary
-            boundary_gdf = get_city_from_db(city_id)
+            boundary_gdf = _cached_city_from_db(city_id)
             
             if boundary_gdf is None or boundary_gdf.empty:
+                _cached_city_from_db.clear(city_id)
                 st.sidebar.error("Failed to load city boundary from database")
                 logger.error(f"Failed to load boundary for city_id {city_id}")
                 return
             
             # Load stores
-            stores_gdf = get_stores_from_db(city_id)
+            stores_gdf = _cached_stores_from_db(city_id)
             
             if stores_gdf is None:
+                _cached_stores_from_db.clear(city_id)
                 st.sidebar.error("Failed to load stores from database")
                 logger.error(f"Failed to load stores for city_id {city_id}")
                 return
@@ -501,10 +711,7 @@ def load_existing_data(city_id: int):
                 logger.info(f"No stores found for city_id {city_id}")
             
             # Update session state
-            st.session_state.boundary_gdf = boundary_gdf
-            st.session_state.stores_gdf = stores_gdf
-            st.session_state.city_info = get_boundary_info(boundary_gdf)
-            st.session_state.data_loaded = True
+            store_city_data(boundary_gdf, stores_gdf, get_boundary_info(boundary_gdf))
             
             st.sidebar.success("Data loaded successfully!")
             logger.info(f"Successfully loaded data for city_id {city_id}")
@@ -513,15 +720,35 @@ def load_existing_data(city_id: int):
         st.sidebar.error(f"Error loading data: {str(e)}")
         logger.error(f"Exception loading data for city_id {city_id}: {e}", exc_info=True)
 
-def fetch_new_data(city: str, state: str):
-    """Fetch new data from OpenStreetMap."""
-    start_time = datetime.now()
+def fetch_new_data(city: str, state: str, refresh: bool = False):
+    """
+    Fetch new data from OpenStreetMap.
+    
+    Args:
+        city: City name
+        state: State name
+        refresh: If True, bypass cached OSM results and query again
+    """
+    from db_setup import (
+        check_city_exists,
+        save_city_to_db,
+        save_stores_to_db,
+        log_fetch_metadata,
+        delete_city_without_stores
+    )
+    
+    start_time = time.perf_counter()
+    
+    if refresh:
+        _cached_boundary.clear(city, state, Config.DEFAULT_COUNTRY)
     
     # Fetch boundary
     with st.spinner(f"Fetching boundary for {city}, {state}..."):
-        boundary_gdf = fetch_city_boundary(city, state, Config.DEFAULT_COUNTRY)
+        boundary_gdf = _cached_boundary(city, state, Config.DEFAULT_COUNTRY)
         
         if boundary_gdf is None or boundary_gdf.empty:
+            # Don't keep failed lookups around for the whole TTL
+            _cached_boundary.clear(city, state, Config.DEFAULT_COUNTRY)
             st.sidebar.error(f"Could not find boundary for {city}, {state}")
             return
         
@@ -531,52 +758,151 @@ def fetch_new_data(city: str, state: str):
         
         st.sidebar.success("✓ Boundary fetched")
     
-    # Fetch stores
-    with st.spinner("Fetching grocery stores..."):
-        stores_gdf = fetch_grocery_stores(boundary_gdf)
-        
-        if stores_gdf is None:
-            st.sidebar.error("Failed to fetch grocery stores")
-            return
-        
-        if not validate_stores(stores_gdf):
-            st.sidebar.warning("Some store data may be invalid")
-        
-        if stores_gdf.empty:
-            st.sidebar.warning("No grocery stores found in this area")
-        else:
-            st.sidebar.success(f"✓ Found {len(stores_gdf)} stores")
+    # A new city row only needs the boundary, so save it on a worker thread
+    # while the (much slower) Overpass store query runs here. An existing
+    # row is only overwritten once its new stores are in hand, so a failed
+    # store fetch leaves the old boundary, stores and fetch date intact.
+    is_new_city = check_city_exists(city, state, Config.DEFAULT_COUNTRY) is None
     
-    # Save to database
-    with st.spinner("Saving to database..."):
-        city_id = save_city_to_db(boundary_gdf)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        city_id_future = executor.submit(save_city_to_db, boundary_gdf) if is_new_city else None
         
-        if city_id is None:
-            st.sidebar.warning("Could not save city to database")
-        else:
-            stores_count = save_stores_to_db(stores_gdf, city_id)
+        # Fetch stores
+        with st.spinner("Fetching grocery stores..."):
+            boundary_wkb = boundary_gdf.geometry.iloc[0].wkb
             
-            # Log metadata
-            duration = (datetime.now() - start_time).total_seconds()
-            log_fetch_metadata(
-                city_id=city_id,
-                status='success',
-                stores_count=stores_count
-            )
+            if refresh:
+                _cached_stores.clear(boundary_wkb)
+            
+            stores_gdf = _cached_stores(boundary_wkb)
+            
+            if stores_gdf is None:
+                _cached_stores.clear(boundary_wkb)
+                st.sidebar.error("Failed to fetch grocery stores")
+                
+                # Don't leave a new city with no stores behind; it would
+                # later load as a city without a single grocery store
+                city_id = city_id_future.result() if city_id_future else None
+                if city_id is not None:
+                    delete_city_without_stores(city_id)
+                    _cached_city_exists.clear(city.lower(), state.lower(), Config.DEFAULT_COUNTRY.lower())
+                    _cached_city_from_db.clear(city_id)
+                    _cached_stores_from_db.clear(city_id)
+                return
+            
+            if not validate_stores(stores_gdf):
+                st.sidebar.warning("Some store data may be invalid")
+            
+            if stores_gdf.empty:
+                st.sidebar.warning("No grocery stores found in this area")
+            else:
+                st.sidebar.success(f"✓ Found {len(stores_gdf)} stores")
+        
+        # Save to database
+        with st.spinner("Saving to database..."):
+            if city_id_future:
+                city_id = city_id_future.result()
+            else:
+                city_id = save_city_to_db(boundary_gdf)
             
-            st.sidebar.success("✓ Data saved to database")
+            if city_id is None:
+                st.sidebar.warning("Could not save city to database")
+            else:
+                stores_count = save_stores_to_db(stores_gdf, city_id)
+                
+                # Stored rows changed, so drop any cached copies for this city
+                _cached_city_exists.clear(city.lower(), state.lower(), Config.DEFAULT_COUNTRY.lower())
+                _cached_city_from_db.clear(city_id)
+                _cached_stores_from_db.clear(city_id)
+                
+                # Log metadata
+                duration = time.perf_counter() - start_time
+                log_fetch_metadata(
+                    city_id=city_id,
+                    status='success',
+                    stores_count=stores_count
+                )
+                
+                st.sidebar.success("✓ Data saved to database")
     
     # Update session state
+    store_city_data(boundary_gdf, stores_gdf, get_boundary_info(boundary_gdf))
+
+def make_city_key(
+    boundary_gdf: gpd.GeoDataFrame,
+    stores_gdf: gpd.GeoDataFrame
+) -> tuple:
+    """
+    Build a hashable key identifying a loaded city and its stores.
+    
+    Cached functions take this key instead of hashing GeoDataFrames.
+    
+    Args:
+        boundary_gdf: GeoDataFrame with city boundary
+        stores_gdf: GeoDataFrame with store locations
+        
+    Returns:
+        Tuple of (name, state, content digest)
+    """
+    digest = hashlib.sha1(boundary_gdf.geometry.iloc[0].wkb)
+    
+    if stores_gdf is not None and not stores_gdf.empty:
+        digest.update(b''.join(stores_gdf.geometry.to_wkb()))
+    
+    row = boundary_gdf.iloc[0]
+    return (row.get('name', ''), row.get('state', ''), digest.hexdigest())
+
+def store_city_data(
+    boundary_gdf: gpd.GeoDataFrame,
+    stores_gdf: gpd.GeoDataFrame,
+    city_info: dict
+):
+    """
+    Store loaded city data in session state.
+    
+    GeoDataFrames are kept as-is: session state lives in memory and is not
+    pickled between reruns, and where pickling does happen (st.cache_data)
+    geometries are already serialized as WKB.
+    
+    Args:
+        boundary_gdf: GeoDataFrame with city boundary
+        stores_gdf: GeoDataFrame with store locations
+        city_info: Boundary metadata for display
+    """
+    # Halve the memory held per session; float32 is plenty for display
+    boundary_gdf = downcast_numeric_columns(boundary_gdf)
+    stores_gdf = downcast_numeric_columns(stores_gdf)
+    
+    # Build the spatial index now; geopandas keeps it on the GeoDataFrame,
+    # so spatial queries during later reruns reuse it
+    if stores_gdf is not None and not stores_gdf.empty:
+        _ = stores_gdf.sindex
+    
     st.session_state.boundary_gdf = boundary_gdf
+    # Maps only need a display-resolution outline; areas use the original
+    st.session_state.boundary_display_gdf = simplify_boundary(
+        boundary_gdf,
+        Config.BOUNDARY_DISPLAY_TOLERANCE
+    )
     st.session_state.stores_gdf = stores_gdf
-    st.session_state.city_info = get_boundary_info(boundary_gdf)
+    st.session_state.city_info = city_info
+    st.session_state.city_key = make_city_key(boundary_gdf, stores_gdf)
+    st.session_state.store_types = get_unique_store_types(stores_gdf)
+    st.session_state.store_summary = get_store_summary(
+        stores_gdf,
+        boundary_gdf['area_km2'].iloc[0]
+    )
     st.session_state.data_loaded = True
 
 def clear_session_state():
     """Clear all session state data."""
     st.session_state.boundary_gdf = None
+    st.session_state.boundary_display_gdf = None
     st.session_state.stores_gdf = None
     st.session_state.city_info = None
+    st.session_state.city_key = None
+    st.session_state.store_types = []
+    st.session_state.store_summary = None
     st.session_state.current_city = None
     st.session_state.current_state = None
     st.session_state.data_loaded = False
@@ -584,6 +910,7 @@ def clear_session_state():
     st.session_state.pending_state = None
     st.session_state.show_options = False
     st.session_state.existing_city_id = None
+    st.session_state.existing_city_row = None
     st.session_state.analysis_point = None
     st.session_state.show_analysis = False
     st.session_state.show_walkability_buffers = False
@@ -591,20 +918,21 @@ def clear_session_state():
     st.session_state.input_method = "City Name"
     st.session_state.custom_location = None
 
+@st.fragment
 def render_statistics():
     """Render statistics about the current city."""
-    if not st.session_state.data_loaded:
+    ss = st.session_state
+    
+    if not ss.data_loaded:
         return
     
-    boundary_gdf = st.session_state.boundary_gdf
-    stores_gdf = st.session_state.stores_gdf
+    # Summary is computed once when the city is loaded
+    summary = ss.store_summary
     
-    if boundary_gdf is None or boundary_gdf.empty:
+    if summary is None:
         return
     
-    # Get summary
-    area = boundary_gdf['area_km2'].iloc[0]
-    summary = get_store_summary(stores_gdf, area)
+    area = ss.city_info['area_km2']
     
     # Display statistics
     st.subheader("📊 Statistics")
@@ -699,59 +1027,31 @@ def render_walkability_controls():
             boundary_gdf = st.session_state.boundary_gdf
             if boundary_gdf is not None and not boundary_gdf.empty:
                 try:
-                    # Create buffers around stores
-                    buffered_stores = buffer_geometry(stores_gdf, st.session_state.walkability_radius * 1000)
+                    # Get city boundary as proper Shapely geometry
+                    city_boundary_geom = boundary_gdf.geometry.iloc[0]
+                    
+                    # Ensure it's a valid geometry
+                    if not isinstance(city_boundary_geom, (Polygon, MultiPolygon)):
+                        st.warning("Invalid boundary geometry")
+                        return
+                    
+                    # Areas come from the city's cached UTM projection
+                    covered_area_km2, city_area_km2 = _walkability_coverage(
+                        st.session_state.city_key,
+                        st.session_state.walkability_radius,
+                        boundary_gdf,
+                        stores_gdf
+                    )
+                    
+                    coverage_pct = (covered_area_km2 / city_area_km2) * 100
+                    
+                    # Display coverage stats
+                    st.markdown(f"""
+                    **Coverage Statistics:**
+                    - 🟢 Walkable area: **{covered_area_km2:.2f} km²** ({coverage_pct:.1f}% of city)
+                    - 🔴 Not walkable: **{city_area_km2 - covered_area_km2:.2f} km²** ({100 - coverage_pct:.1f}% of city)
+                    """)
                     
-                    if buffered_stores is not None and not buffered_stores.empty:
-                        # Calculate coverage area
-                        from shapely.ops import unary_union
-                        from shapely.geometry import Polygon, MultiPolygon
-                        
-                        # Merge all buffers into one geometry
-                        merged_buffers = unary_union(buffered_stores.geometry)
-                        
-                        # Get city boundary as proper Shapely geometry
-                        city_boundary_geom = boundary_gdf.geometry.iloc[0]
-                        
-                        # Ensure it's a valid geometry
-                        if not isinstance(city_boundary_geom, (Polygon, MultiPolygon)):
-                            st.warning("Invalid boundary geometry")
-                            return
-                        
-                        # Calculate intersection (covered area within city)
-                        covered_area_geom = merged_buffers.intersection(city_boundary_geom)
-                        
-                        # Calculate areas in projected CRS for accuracy
-                        import geopandas as gpd
-                        
-                        # Create GeoDataFrames with proper geometry
-                        covered_gdf = gpd.GeoDataFrame(
-                            {'id': [1]},
-                            geometry=gpd.GeoSeries([covered_area_geom]),
-                            crs='EPSG:4326'
-                        )
-                        city_gdf = gpd.GeoDataFrame(
-                            {'id': [1]},
-                            geometry=gpd.GeoSeries([city_boundary_geom]),
-                            crs='EPSG:4326'
-                        )
-                        
-                        # Project to UTM for accurate area calculation
-                        covered_projected = covered_gdf.to_crs(covered_gdf.estimate_utm_crs())
-                        city_projected = city_gdf.to_crs(city_gdf.estimate_utm_crs())
-                        
-                        covered_area_km2 = covered_projected.geometry.area.iloc[0] / 1_000_000
-                        city_area_km2 = city_projected.geometry.area.iloc[0] / 1_000_000
-                        
-                        coverage_pct = (covered_area_km2 / city_area_km2) * 100
-                        
-                        # Display coverage stats
-                        st.markdown(f"""
-                        **Coverage Statistics:**
-                        - 🟢 Walkable area: **{covered_area_km2:.2f} km²** ({coverage_pct:.1f}% of city)
-                        - 🔴 Not walkable: **{city_area_km2 - covered_area_km2:.2f} km²** ({100 - coverage_pct:.1f}% of city)
-                        """)
-                        
                 except Exception as e:
                     logger.error(f"Error calculating coverage: {e}")
                     st.warning("Could not calculate coverage statistics")
@@ -796,8 +1096,9 @@ def render_accessibility_analysis():
             # Find nearest store
             nearest = find_nearest_store((lat, lon), stores_gdf)
             
-            # Count stores in radius
-            count = count_stores_in_radius((lat, lon), stores_gdf, radius)
+            # Find stores in radius
+            nearby_positions, nearby_distances = find_stores_in_radius((lat, lon), stores_gdf, radius)
+            count = len(nearby_positions)
             
             # Display results in columns
             result_col1, result_col2, result_col3 = st.columns(3)
@@ -875,37 +1176,38 @@ def render_accessibility_analysis():
             # Detailed store list
             if count > 0:
                 with st.expander(f"📋 View all {count} nearby stores"):
-                    nearby_stores = []
+                    nearby = stores_gdf.iloc[nearby_positions]
+                    names = nearby['name'].fillna('').astype(str)
                     
-                    for idx, store in stores_gdf.iterrows():
-                        store_lat = store.geometry.y
-                        store_lon = store.geometry.x
-                        distance_km = calculate_distance((lat, lon), (store_lat, store_lon))
-                        
-                        if distance_km <= radius:
-                            nearby_stores.append({
-                                'Name': store['name'] if store['name'] else 'Unnamed',
-                                'Type': store['shop_type'].replace('_', ' ').title(),
-                                'Distance (km)': round(distance_km, 2)
-                            })
+                    df = pd.DataFrame({
+                        'Name': names.where(names != '', 'Unnamed').to_numpy(),
+                        'Type': nearby['shop_type'].astype(str).str.replace('_', ' ').str.title().to_numpy(),
+                        'Distance (km)': nearby_distances
+                    })
                     
                     # Sort by distance
-                    nearby_stores.sort(key=lambda x: x['Distance (km)'])
+                    df = df.sort_values('Distance (km)', kind='stable')
                     
                     # Display as table
-                    df = pd.DataFrame(nearby_stores)
                     st.dataframe(df, width="stretch", hide_index=True)
         else:
             st.write("**Click on the map to analyze a location**")
 
 def render_map():
-    """Render the interactive map."""
-    if not st.session_state.data_loaded:
+    """
+    Render the interactive map.
+    
+    Called from the render_analysis_panels fragment, so store-type filter
+    toggles and map clicks don't rerun the sidebar and data loading.
+    """
+    ss = st.session_state
+    
+    if not ss.data_loaded:
         st.info("👈 Select a city from the sidebar to get started")
         return
     
-    boundary_gdf = st.session_state.boundary_gdf
-    stores_gdf = st.session_state.stores_gdf
+    boundary_gdf = ss.boundary_display_gdf
+    stores_gdf = ss.stores_gdf
     
     if boundary_gdf is None or boundary_gdf.empty:
         st.warning("No boundary data available")
@@ -914,84 +1216,96 @@ def render_map():
     st.subheader("🗺️ Interactive Map")
     
     # Store type filter
-    if stores_gdf is not None and not stores_gdf.empty:
-        unique_types = get_unique_store_types(stores_gdf)
-        
-        if unique_types:
-            st.write("**Filter by store type:**")
-            
-            # Create columns for checkboxes
-            num_types = len(unique_types)
-            num_cols = min(4, num_types)
-            cols = st.columns(num_cols)
-            
-            selected_types = []
-            for idx, store_type in enumerate(unique_types):
-                col_idx = idx % num_cols
-                if cols[col_idx].checkbox(
-                    get_display_name(store_type),
-                    value=True,
-                    key=f"filter_{store_type}"
-                ):
-                    selected_types.append(store_type)
-            
-            # Filter stores
-            if selected_types:
-                filtered_stores = filter_stores_by_type(stores_gdf, selected_types)
-            else:
-                filtered_stores = stores_gdf
-        else:
-            filtered_stores = stores_gdf
+    unique_types = ss.store_types if stores_gdf is not None and not stores_gdf.empty else []
+    
+    if unique_types:
+        selected_types = st.multiselect(
+            "Filter by store type",
+            options=unique_types,
+            default=unique_types,
+            format_func=get_display_name
+        )
     else:
-        filtered_stores = stores_gdf
+        selected_types = []
     
-    # Create map
+    # Clicks are only needed for accessibility analysis; without them the map
+    # can be rendered as static HTML that never sends state back
+    click_analysis = st.toggle(
+        "Enable click analysis",
+        value=True,
+        key="click_analysis",
+        help="Turn off to browse the map without rerunning the app on each interaction"
+    )
+    
+    analysis_point = ss.analysis_point
+    
+    map_args = (
+        ss.city_key,
+        tuple(sorted(selected_types)),
+        analysis_point,
+        ss.analysis_radius,
+        ss.show_walkability_buffers,
+        ss.walkability_radius,
+        boundary_gdf,
+        stores_gdf
+    )
+    
+    # Create map (reused across reruns while its inputs are unchanged)
     with st.spinner("Creating map..."):
-        # Prepare walkability buffers if enabled
-        walkability_gdf = None
-        if st.session_state.show_walkability_buffers and filtered_stores is not None and not filtered_stores.empty:
-            try:
-                walkability_gdf = buffer_geometry(
-                    filtered_stores, 
-                    st.session_state.walkability_radius * 1000  # Convert km to meters
-                )
-            except Exception as e:
-                logger.error(f"Error creating walkability buffers: {e}")
+        if not click_analysis:
+            st.iframe(_build_map_html(*map_args), height=600)
+            return
         
-        m = create_full_map(
-            boundary_gdf,
-            filtered_stores,
-            use_clusters=True,
-            add_legend=True,
-            analysis_point=st.session_state.analysis_point,
-            analysis_radius=st.session_state.analysis_radius,
-            walkability_gdf=walkability_gdf,
-            walkability_radius=st.session_state.walkability_radius
-        )
+        # Render a copy so the shared cached map is never modified; the copy
+        # keeps the element IDs, so the payload is identical across reruns
+        m = copy.deepcopy(_build_map(*map_args))
+        
+        # Display map; clicks are stored by the on_change callback, after
+        # which the enclosing fragment reruns with the new analysis point
+        from streamlit_folium import st_folium
         
-        # Display map and capture clicks
-        map_data = st_folium(
+        st_folium(
             m, 
             width=1200, 
             height=600,
             returned_objects=["last_clicked"],
-            key="main_map"  # Add key to prevent unnecessary reruns
+            key="main_map",  # Add key to prevent unnecessary reruns
+            on_change=store_map_click
         )
-        
-        # Store clicked location
-        if map_data and map_data.get('last_clicked'):
-            new_lat = map_data['last_clicked']['lat']
-            new_lon = map_data['last_clicked']['lng']
-            
-            # Only update if coordinates changed significantly (to avoid re-runs on map panning)
-            # Use a larger threshold to prevent infinite loops
-            if (st.session_state.analysis_point is None or 
-                abs(st.session_state.analysis_point[0] - new_lat) > 0.001 or
-                abs(st.session_state.analysis_point[1] - new_lon) > 0.001):
-                
-                st.session_state.analysis_point = (new_lat, new_lon)
-                st.session_state.show_analysis = True
-                st.rerun()
+
+def store_map_click():
+    """Store the last clicked map location as the analysis point."""
+    map_data = st.session_state.get("main_map")
+    
+    if not map_data or not map_data.get('last_clicked'):
+        return
+    
+    new_point = (map_data['last_clicked']['lat'], map_data['last_clicked']['lng'])
+    analysis_point = st.session_state.analysis_point
+    
+    # Ignore repeat clicks on the same spot so the map isn't rebuilt for them
+    if (analysis_point is not None and
+        max(abs(analysis_point[0] - new_point[0]), abs(analysis_point[1] - new_point[1])) <= 1e-5):
+        return
+    
+    st.session_state.analysis_point = new_point
+    st.session_state.show_analysis = True
+
+@st.fragment
+def render_analysis_panels():
+    """
+    Render the walkability, accessibility and map panels.
+    
+    These panels share the walkability settings, the search radius and
+    the clicked analysis point, so they run together as one fragment:
+    their widgets and map clicks rerun only this part of the page, not
+    the sidebar or the statistics.
+    """
+    render_walkability_controls()
+    st.divider()
+    render_accessibility_analysis()
+    st.divider()
+    render_map()
 
 def main():
     """Main application function."""
@@ -1006,11 +1320,7 @@ def main():
     if st.session_state.data_loaded:
         render_statistics()
         st.divider()
-        render_walkability_controls()
-        st.divider()
-        render_accessibility_analysis()
-        st.divider()
-        render_map()
+        render_analysis_panels()
     else:
         # Welcome message
         st.info("""
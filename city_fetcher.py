@@ -9,19 +9,31 @@ This module handles:
 """
 
 import logging
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, List, Tuple
 import geopandas as gpd
-import osmnx as ox
+import numpy as np
+import shapely
+from pyproj import CRS, Geod
+from pyproj.exceptions import ProjError
+from shapely.errors import GEOSException
 from shapely.geometry import Polygon, MultiPolygon
+from shapely.geometry.polygon import orient
 from shapely.ops import unary_union
 
+from utils.osm_utils import get_osmnx
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Configure osmnx settings
-ox.settings.log_console = False
-ox.settings.use_cache = True
+# Parsed once so CRS checks compare objects instead of parsing a string
+WGS84_CRS = CRS.from_epsg(4326)
+
+# Ellipsoid used for geodesic area calculations
+WGS84_GEOD = Geod(ellps='WGS84')
+
+# Boundaries with fewer vertices than this are not simplified
+MIN_SIMPLIFY_COORDINATES = 256
 
 def validate_inputs(city: str, state: str, country: str) -> bool:
     """
@@ -54,19 +66,19 @@ def build_query_string(city: str, state: str, country: str) -> str:
     Build OSM query string for geocoding.
     
     Args:
-        city: City name
-        state: State name
-        country: Country name
+        city: City name, already stripped
+        state: State name, already stripped
+        country: Country name, already stripped
         
     Returns:
         Formatted query string
     """
     # For US cities, include state for better disambiguation
     if country.upper() == 'USA':
-        return f"{city.strip()}, {state.strip()}, USA"
+        return f"{city}, {state}, USA"
     else:
         # For international cities
-        return f"{city.strip()}, {state.strip()}, {country.strip()}"
+        return f"{city}, {state}, {country}"
     
 def fetch_city_boundary(
     city: str,
@@ -91,6 +103,9 @@ def fetch_city_boundary(
     if not validate_inputs(city, state, country):
         return None
     
+    # Normalize once; everything below uses the stripped names
+    city, state, country = city.strip(), state.strip(), country.strip()
+    
     try:
         # Build query string
         query = build_query_string(city, state, country)
@@ -100,6 +115,7 @@ def fetch_city_boundary(
         # which_result=None will return the first result
         # which_result=1 will also return the first result
         # which_result=2 will return the second result, etc.
+        ox = get_osmnx()
         gdf = ox.geocode_to_gdf(query, which_result=which_result)
         
         if gdf is None or gdf.empty:
@@ -107,12 +123,9 @@ def fetch_city_boundary(
             return None
         
         # Add metadata
-        gdf['name'] = city.strip()
-        gdf['state'] = state.strip()
-        gdf['country'] = country.strip()
-        
-        # Calculate area
-        gdf['area_km2'] = calculate_area(gdf)
+        gdf['name'] = city
+        gdf['state'] = state
+        gdf['country'] = country
         
         # Extract OSM ID from the 'osmid' column if it exists
         if 'osmid' in gdf.columns:
@@ -121,8 +134,11 @@ def fetch_city_boundary(
             gdf['osm_id'] = 0
         
         # Ensure we're using EPSG:4326 (WGS84)
-        if gdf.crs != 'EPSG:4326':
-            gdf = gdf.to_crs('EPSG:4326')
+        if gdf.crs != WGS84_CRS:
+            gdf = gdf.to_crs(WGS84_CRS)
+        
+        # Calculate the area of each result in one pass
+        gdf['area_km2'] = calculate_areas(gdf)
         
         num_results = len(gdf)
         logger.info(f"Successfully fetched {num_results} boundary(ies) for {city}, {state}")
@@ -176,30 +192,62 @@ def validate_boundary(gdf: gpd.GeoDataFrame) -> bool:
     
     return True
 
-def calculate_area(gdf: gpd.GeoDataFrame) -> float:
+def orient_for_area(geom):
     """
-    Calculate area of a boundary in square kilometers.
+    Orient polygon shells counter-clockwise and holes clockwise.
+    
+    pyproj signs each ring's area by its winding, so oppositely wound
+    parts would cancel and same-wound holes would be added.
     
     Args:
-        gdf: GeoDataFrame with boundary geometry
+        geom: Shapely geometry
         
     Returns:
-        Area in square kilometers
+        Geometry with consistently oriented rings; non-polygons unchanged
     """
-    try:
-        # Convert to a projected CRS for accurate area calculation
-        # Use UTM zone automatically based on centroid
-        gdf_projected = gdf.to_crs(gdf.estimate_utm_crs())
+    if isinstance(geom, Polygon):
+        return orient(geom, sign=1.0)
+    
+    if isinstance(geom, MultiPolygon):
+        return MultiPolygon([orient(part, sign=1.0) for part in geom.geoms])
+    
+    return geom
+
+def calculate_areas(gdf: gpd.GeoDataFrame) -> List[float]:
+    """
+    Calculate the area of every boundary row in square kilometers.
+    
+    Args:
+        gdf: GeoDataFrame with boundary geometries
         
-        # Calculate area in square meters, convert to km²
-        area_m2 = gdf_projected.geometry.area.iloc[0]
-        area_km2 = area_m2 / 1_000_000
+    Returns:
+        List of areas in square kilometers, one per row
+    """
+    try:
+        if gdf.crs is not None and gdf.crs != WGS84_CRS:
+            gdf = gdf.to_crs(WGS84_CRS)
         
-        return round(area_km2, 2)
+        # Geodesic area on the WGS84 ellipsoid; no projection needed
+        return [
+            round(abs(WGS84_GEOD.geometry_area_perimeter(orient_for_area(geom))[0]) / 1_000_000, 2)
+            for geom in gdf.geometry
+        ]
         
-    except Exception as e:
+    except (ValueError, TypeError, GEOSException, ProjError) as e:
         logger.error(f"Error calculating area: {e}")
-        return 0.0
+        return [0.0] * len(gdf)
+
+def calculate_area(gdf: gpd.GeoDataFrame) -> float:
+    """
+    Calculate area of a boundary in square kilometers.
+    
+    Args:
+        gdf: GeoDataFrame with boundary geometry
+        
+    Returns:
+        Area in square kilometers
+    """
+    return calculate_areas(gdf.iloc[[0]])[0]
     
 def get_boundary_info(gdf: gpd.GeoDataFrame) -> Dict[str, Any]:
     """
@@ -270,10 +318,15 @@ def simplify_boundary(
         tolerance: Simplification tolerance in degrees (default: 0.001)
         
     Returns:
-        GeoDataFrame with simplified geometry
+        GeoDataFrame with simplified geometry (the input itself when
+        there is nothing to simplify)
     """
     try:
-        if gdf is None or gdf.empty:
+        if gdf is None or gdf.empty or tolerance <= 0:
+            return gdf
+        
+        # Outlines this sparse have nothing worth removing
+        if shapely.get_num_coordinates(gdf.geometry.values).sum() < MIN_SIMPLIFY_COORDINATES:
             return gdf
         
         gdf_simplified = gdf.copy()
@@ -305,18 +358,23 @@ def ensure_multipolygon(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
         
         gdf_copy = gdf.copy()
         
-        # Convert Polygon to MultiPolygon if needed
-        def to_multipolygon(geom):
-            if isinstance(geom, Polygon):
-                return MultiPolygon([geom])
-            elif isinstance(geom, MultiPolygon):
-                return geom
-            else:
-                logger.warning(f"Unexpected geometry type: {type(geom)}")
-                return geom
+        # Wrap every Polygon into a single-part MultiPolygon in one call
+        geoms = gdf_copy.geometry.values.copy()
+        type_ids = shapely.get_type_id(geoms)
+        is_polygon = type_ids == shapely.GeometryType.POLYGON
+        
+        if is_polygon.any():
+            geoms[is_polygon] = shapely.multipolygons(
+                geoms[is_polygon],
+                indices=np.arange(is_polygon.sum())
+            )
+        
+        unexpected = ~is_polygon & (type_ids != shapely.GeometryType.MULTIPOLYGON)
+        if unexpected.any():
+            unexpected_types = gdf_copy.geometry[unexpected].geom_type.unique().tolist()
+            logger.warning(f"Unexpected geometry types: {unexpected_types}")
         
-        # Apply to each geometry in the GeoSeries
-        gdf_copy['geometry'] = gdf_copy.geometry.map(to_multipolygon)
+        gdf_copy['geometry'] = geoms
         
         return gdf_copy
         
@@ -338,6 +396,9 @@ US_STATES = [
     "West Virginia", "Wisconsin", "Wyoming", "District of Columbia"
 ]
 
+# Dropdown position of each state (position 0 is the blank option)
+US_STATE_INDEX = {state: idx for idx, state in enumerate(US_STATES, start=1)}
+
 if __name__ == "__main__":
     """Test the city fetcher with example cities."""
     
@@ -345,6 +406,29 @@ if __name__ == "__main__":
     print("City Fetcher Test")
     print("=" * 60)
     
+    # Check geodesic areas against a UTM projection for shapes whose ring
+    # orientation matters: a MultiPolygon with oppositely wound parts and
+    # a polygon whose hole is wound the same way as its shell
+    print("\nChecking area calculation...")
+    
+    test_shapes = {
+        "MultiPolygon": MultiPolygon([
+            Polygon([(-75.2, 39.9), (-75.1, 39.9), (-75.1, 40.0), (-75.2, 40.0)]),
+            Polygon([(-75.0, 39.9), (-75.0, 40.0), (-74.9, 40.0), (-74.9, 39.9)])
+        ]),
+        "Polygon with hole": Polygon(
+            [(-75.2, 39.9), (-75.1, 39.9), (-75.1, 40.0), (-75.2, 40.0)],
+            [[(-75.17, 39.93), (-75.13, 39.93), (-75.13, 39.97), (-75.17, 39.97)]]
+        )
+    }
+    
+    for label, geom in test_shapes.items():
+        shape_gdf = gpd.GeoDataFrame(geometry=[geom], crs='EPSG:4326')
+        utm_area = shape_gdf.to_crs(shape_gdf.estimate_utm_crs()).geometry.area.iloc[0] / 1_000_000
+        area = calculate_area(shape_gdf)
+        ok = abs(area - utm_area) <= 0.005 * utm_area
+        print(f"{'✓' if ok else '✗'} {label}: {area} km² (UTM: {utm_area:.2f} km²)")
+    
     # Test cities
     test_cities = [
         ("Philadelphia", "Pennsylvania", "USA"),
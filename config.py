@@ -50,6 +50,7 @@ class Config:
     BOUNDARY_COLOR = "#2E86AB"
     BOUNDARY_WEIGHT = 3
     BOUNDARY_FILL_OPACITY = 0.1
+    BOUNDARY_DISPLAY_TOLERANCE = 0.0005  # degrees (~50 m); display copy only
     
     # Store marker colors by type
     STORE_COLORS = {
@@ -72,6 +73,9 @@ class Config:
     # Marker cluster settings
     USE_MARKER_CLUSTERS = True
     
+    # Number of rendered maps kept in memory
+    MAP_CACHE_MAX_ENTRIES = 8
+    
     # ============================================================================
     # OSM QUERY SETTINGS
     # ============================================================================
@@ -94,6 +98,9 @@ class Config:
     # Cache settings
     ENABLE_CACHE = True
     CACHE_TTL = 3600  # seconds (1 hour)
+    CACHE_MAX_ENTRIES = 32  # per cached function
+    OSM_CACHE_PERSIST = "disk"  # keep OSM fetches across restarts (None to disable)
+    CITY_LOOKUP_TTL = 300  # seconds; existing-city checks are cleared on save
     
     # Data freshness threshold (days)
     DATA_FRESHNESS_DAYS = 30
@@ -8,16 +8,21 @@ This module handles:
 - Data retrieval and validation
 """
 import os
+import re
 import traceback
 import logging
-from typing import Optional, Dict
+import threading
+from typing import Optional, Dict, Any
 from contextlib import contextmanager
 
 import psycopg2
 from psycopg2 import sql, extras
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+import pandas as pd
 import geopandas as gpd
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -27,6 +32,22 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Connection pool settings
+POOL_SIZE = 5
+POOL_MAX_OVERFLOW = 10
+POOL_RECYCLE = 1800  # seconds
+
+# Rows sent per INSERT statement when bulk-saving stores
+STORE_INSERT_PAGE_SIZE = 1000
+
+# Column limits of grocery_stores (name VARCHAR(255), shop_type VARCHAR(50))
+STORE_NAME_MAX_LENGTH = 255
+STORE_TYPE_MAX_LENGTH = 50
+
+# Shared engine, created on first use
+_engine: Optional[Engine] = None
+_engine_lock = threading.Lock()
+
 class DatabaseConfig:
     """Database configuration manager."""
     
@@ -47,7 +68,7 @@ class DatabaseConfig:
         
     def get_connection_string(self) -> str:
         """Get SQLAlchemy connection string."""
-        return f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}"
+        return f"postgresql+psycopg2://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}"
     
     def get_psycopg2_params(self) -> Dict[str, str]:
         """Get psycopg2 connection parameters."""
@@ -59,34 +80,66 @@ class DatabaseConfig:
             'password': self.password
         }
     
+def get_engine() -> Engine:
+    """
+    Get the shared SQLAlchemy engine, creating it on first use.
+    
+    The engine keeps a pool of open connections so each query reuses an
+    existing connection instead of paying connection setup again.
+    
+    Returns:
+        SQLAlchemy Engine
+    """
+    global _engine
+    
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                config = DatabaseConfig()
+                _engine = create_engine(
+                    config.get_connection_string(),
+                    pool_size=POOL_SIZE,
+                    max_overflow=POOL_MAX_OVERFLOW,
+                    pool_pre_ping=True,
+                    pool_recycle=POOL_RECYCLE
+                )
+                logger.info(f"Created database engine for {config.host}:{config.port}/{config.database}")
+    
+    return _engine
+
 @contextmanager
 def get_db_connection(autocommit: bool = False):
     """
     Context manager for database connections.
     
+    Regular connections are checked out from the shared pool and returned
+    to it on exit. Autocommit connections are only needed for setup tasks,
+    so they are opened directly and never returned to the pool.
+    
     Args:
         autocommit: If True, set connection to autocommit mode
         
     Yields:
         psycopg2 connection object
     """
-    config = DatabaseConfig()
-    params = config.get_psycopg2_params()
     conn = None
 
     try:
-        conn = psycopg2.connect(
-            host=params['host'],
-            port=params['port'],
-            database=params['database'],
-            user=params['user'],
-            password=params['password']
-        )
         if autocommit:
+            params = DatabaseConfig().get_psycopg2_params()
+            conn = psycopg2.connect(
+                host=params['host'],
+                port=params['port'],
+                database=params['database'],
+                user=params['user'],
+                password=params['password']
+            )
             conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        else:
+            conn = get_engine().raw_connection()
         yield conn
 
-    except psycopg2.Error as e:
+    except (psycopg2.Error, SQLAlchemyError) as e:
         logger.error(f"Database connection error: {e}")
         raise
 
@@ -310,10 +363,73 @@ def save_city_to_db(city_gdf: gpd.GeoDataFrame) -> Optional[int]:
         logger.error(f"Error saving city to database: {e}")
         return None
     
+def delete_city_without_stores(city_id: int) -> bool:
+    """
+    Delete a city row that has no stores saved for it.
+    
+    Used to roll back a new city saved ahead of its stores when the store
+    fetch then fails; a city that already has stores is left untouched.
+    
+    Args:
+        city_id: City ID
+        
+    Returns:
+        True if the city was deleted, False otherwise
+    """
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            
+            delete_sql = """
+                DELETE FROM cities
+                WHERE id = %s
+                  AND NOT EXISTS (
+                      SELECT 1 FROM grocery_stores WHERE city_id = %s
+                  );
+            """
+            
+            cursor.execute(delete_sql, (city_id, city_id))
+            deleted = cursor.rowcount > 0
+            
+            conn.commit()
+            cursor.close()
+            
+            if deleted:
+                logger.info(f"Deleted city_id {city_id}, which had no stores")
+            return deleted
+            
+    except Exception as e:
+        logger.error(f"Error deleting city from database: {e}")
+        return False
+    
+def parse_osm_id(osm_id_raw: Any) -> int:
+    """
+    Convert an OSM identifier to an integer suitable for a BIGINT column.
+    
+    Args:
+        osm_id_raw: OSM ID as an integer or a string like 'node/123456'
+        
+    Returns:
+        Numeric OSM ID
+    """
+    if isinstance(osm_id_raw, str):
+        # Extract number from strings like 'node/123456' or 'way/789012'
+        match = re.search(r'(\d+)', osm_id_raw)
+        if match:
+            return int(match.group(1))
+        return hash(osm_id_raw) % (10 ** 15)  # Fallback: hash to bigint
+    
+    return int(osm_id_raw)
+
 def save_stores_to_db(stores_gdf: gpd.GeoDataFrame, city_id: int) -> int:
     """
     Save grocery stores to database.
     
+    All rows are sent in batched multi-row INSERT statements within a
+    single transaction rather than one statement per store. Rows that
+    would be rejected by the table (unparseable OSM ID, missing or
+    non-point geometry, overlong shop type) are logged and skipped.
+    
     Args:
         stores_gdf: GeoDataFrame containing store locations
         city_id: ID of the parent city
@@ -326,6 +442,40 @@ def save_stores_to_db(stores_gdf: gpd.GeoDataFrame, city_id: int) -> int:
         return 0
     
     try:
+        # Build all rows up front; geometry goes over the wire as WKB.
+        # Rows that would violate the table's constraints are skipped and
+        # logged, since one bad row would otherwise fail the whole batch
+        rows = []
+        for osm_id_raw, name, shop_type, geom in zip(
+            stores_gdf['osm_id'],
+            stores_gdf['name'].fillna('').astype(str),
+            stores_gdf['shop_type'].astype(str),
+            stores_gdf.geometry
+        ):
+            try:
+                osm_id = parse_osm_id(osm_id_raw)
+                if not -2**63 <= osm_id < 2**63:
+                    raise ValueError("OSM ID out of BIGINT range")
+                if geom is None or geom.is_empty or geom.geom_type != 'Point':
+                    geom_type = 'no geometry' if geom is None or geom.is_empty else geom.geom_type
+                    raise ValueError(f"expected a Point geometry, got {geom_type}")
+                if len(shop_type) > STORE_TYPE_MAX_LENGTH:
+                    raise ValueError(f"shop type longer than {STORE_TYPE_MAX_LENGTH} characters")
+                
+                rows.append((
+                    city_id,
+                    osm_id,
+                    name[:STORE_NAME_MAX_LENGTH],
+                    shop_type,
+                    psycopg2.Binary(geom.wkb)
+                ))
+            except Exception as e:
+                logger.warning(f"Skipping store {osm_id_raw!r}: {e}")
+        
+        if not rows:
+            logger.warning("No valid stores to save")
+            return 0
+        
         with get_db_connection() as conn:
             cursor = conn.cursor()
             
@@ -333,49 +483,20 @@ def save_stores_to_db(stores_gdf: gpd.GeoDataFrame, city_id: int) -> int:
                 INSERT INTO grocery_stores (
                     city_id, osm_id, name, shop_type, location
                 )
-                VALUES (%s, %s, %s, %s, ST_GeomFromText(%s, 4326))
-                ON CONFLICT (osm_id, city_id) DO NOTHING;
+                VALUES %s
+                ON CONFLICT (osm_id, city_id) DO NOTHING
+                RETURNING id;
             """
             
-            inserted_count = 0
-            
-            for idx, row in stores_gdf.iterrows():
-                try:
-                    geometry_wkt = row.geometry.wkt
-
-                    # Handle OSM ID - it might be a string like 'node/123' or just an integer
-                    osm_id_raw = row.get('osm_id', 0)
-                    
-                    # Try to extract numeric ID from composite keys
-                    if isinstance(osm_id_raw, str):
-                        # Extract number from strings like 'node/123456' or 'way/789012'
-                        import re
-                        match = re.search(r'(\d+)', str(osm_id_raw))
-                        if match:
-                            osm_id = int(match.group(1))
-                        else:
-                            osm_id = hash(osm_id_raw) % (10 ** 15)  # Fallback: hash to bigint
-                    else:
-                        osm_id = int(osm_id_raw)
-                    
-                    name = str(row.get('name', ''))
-                    shop_type = str(row.get('shop_type', 'unknown'))
-                    
-                    cursor.execute(insert_sql, (
-                        city_id,
-                        osm_id,
-                        name,
-                        shop_type,
-                        geometry_wkt
-                    ))
-                    
-                    if cursor.rowcount > 0:
-                        inserted_count += 1
-                        
-                except Exception as e:
-                    logger.warning(f"Error inserting store at index {idx}: {e}")
-                    logger.debug(f"Store data: osm_id={row.get('osm_id')}, name={row.get('name')}, type={row.get('shop_type')}")
-                    continue
+            inserted = extras.execute_values(
+                cursor,
+                insert_sql,
+                rows,
+                template="(%s, %s, %s, %s, ST_GeomFromWKB(%s, 4326))",
+                page_size=STORE_INSERT_PAGE_SIZE,
+                fetch=True
+            )
+            inserted_count = len(inserted)
             
             conn.commit()
             cursor.close()
@@ -429,6 +550,35 @@ def check_city_exists(city: str, state: str, country: str = 'USA') -> Optional[D
         logger.error(f"Error checking city existence: {e}")
         return None
     
+def read_geodataframe(
+    query: str,
+    engine: Engine,
+    params: tuple,
+    geom_col: str = 'geometry'
+) -> gpd.GeoDataFrame:
+    """
+    Run a PostGIS query and return the result as a GeoDataFrame.
+    
+    geopandas.read_postgis decodes geometries one row at a time; this
+    decodes the whole WKB column in a single vectorized shapely call.
+    
+    Args:
+        query: SQL query selecting a geometry as WKB (ST_AsBinary)
+        engine: SQLAlchemy engine
+        params: Query parameters
+        geom_col: Name of the geometry column in the query result
+        
+    Returns:
+        GeoDataFrame in EPSG:4326
+    """
+    df = pd.read_sql(query, engine, params=params)
+    
+    # psycopg2 returns bytea columns as memoryview, which shapely rejects
+    wkb = [bytes(value) if value is not None else None for value in df.pop(geom_col)]
+    geometry = gpd.GeoSeries.from_wkb(wkb, crs='EPSG:4326')
+    
+    return gpd.GeoDataFrame(df, geometry=geometry)
+
 def get_city_from_db(city_id: int) -> Optional[gpd.GeoDataFrame]:
     """
     Retrieve city boundary from database.
@@ -440,30 +590,20 @@ def get_city_from_db(city_id: int) -> Optional[gpd.GeoDataFrame]:
         GeoDataFrame with city boundary
     """
     try:
-        config = DatabaseConfig()
-        connection_string = config.get_connection_string()
-        
-        logger.info(f"Connecting to database for city_id {city_id}")
-        logger.debug(f"Connection string (masked): postgresql://{config.user}:****@{config.host}:{config.port}/{config.database}")
+        logger.info(f"Querying database for city_id {city_id}")
         
-        engine = create_engine(connection_string)
+        engine = get_engine()
         
         query = """
             SELECT 
                 id, name, state, country, osm_id, 
                 area_km2, fetched_at,
-                boundary as geometry
+                ST_AsBinary(boundary) as geometry
             FROM cities
             WHERE id = %s;
         """
         
-        gdf = gpd.read_postgis(
-            query,
-            engine,
-            geom_col='geometry',
-            params=(city_id,),
-            crs='EPSG:4326'  # Explicitly set CRS
-        )
+        gdf = read_geodataframe(query, engine, params=(city_id,))
         
         if gdf.empty:
             logger.warning(f"No city found with id {city_id}")
@@ -488,31 +628,28 @@ def get_stores_from_db(city_id: int) -> Optional[gpd.GeoDataFrame]:
         GeoDataFrame with store locations
     """
     try:
-        config = DatabaseConfig()
-        connection_string = config.get_connection_string()
+        logger.info(f"Querying database for city_id {city_id}")
         
-        logger.info(f"Connecting to database for city_id {city_id}")
-        logger.debug(f"Connection string (masked): postgresql://{config.user}:****@{config.host}:{config.port}/{config.database}")
-        
-        engine = create_engine(connection_string)
+        engine = get_engine()
         
         query = """
             SELECT 
                 id, city_id, osm_id, name, shop_type, fetched_at,
-                location as geometry
+                ST_Y(location) as lat, ST_X(location) as lon,
+                ST_AsBinary(location) as geometry
             FROM grocery_stores
             WHERE city_id = %s;
         """
         
-        gdf = gpd.read_postgis(
-            query,
-            engine,
-            geom_col='geometry',
-            params=(city_id,),
-            crs='EPSG:4326'  # Explicitly set CRS
-        )
+        gdf = read_geodataframe(query, engine, params=(city_id,))
         
-        return gdf if not gdf.empty else gpd.GeoDataFrame()
+        if gdf.empty:
+            return gpd.GeoDataFrame()
+        
+        # Match the dtype produced by the OSM fetcher
+        gdf['shop_type'] = gdf['shop_type'].astype('category')
+        
+        return gdf
         
     except Exception as e:
         logger.error(f"Error retrieving stores from database: {e}")
@@ -10,19 +10,18 @@ This module handles:
 
 import logging
 from typing import Optional, Dict, List, Any, Union
+import numpy as np
 import geopandas as gpd
-import osmnx as ox
 import pandas as pd
+import shapely
 from shapely.geometry import Point, Polygon, MultiPolygon
 
+from utils.osm_utils import get_osmnx
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Configure osmnx settings
-ox.settings.log_console = False
-ox.settings.use_cache = True
-
 # Define grocery store tags to query from OSM
 # Type hint to satisfy type checker for OSMnx
 GROCERY_TAGS: Dict[str, Union[bool, str, List[str]]] = {
@@ -70,6 +69,7 @@ def fetch_grocery_stores(boundary_gdf: gpd.GeoDataFrame) -> Optional[gpd.GeoData
         # Cast to Dict[str, Union[bool, str, List[str]]] to satisfy type checker
         tags: Dict[str, Union[bool, str, List[str]]] = GROCERY_TAGS
         
+        ox = get_osmnx()
         stores_gdf = ox.features_from_polygon(
             boundary_geom,
             tags=tags
@@ -133,6 +133,10 @@ def process_stores(
         if stores_gdf.crs != 'EPSG:4326':
             stores_gdf = stores_gdf.to_crs('EPSG:4326')
         
+        # Keep plain coordinate columns so later steps don't re-read geometries
+        stores_gdf['lat'] = stores_gdf.geometry.y
+        stores_gdf['lon'] = stores_gdf.geometry.x
+        
         return stores_gdf
         
     except Exception as e:
@@ -152,14 +156,9 @@ def extract_point_geometries(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
     try:
         gdf = gdf.copy()
         
-        def to_point(geom):
-            if isinstance(geom, Point):
-                return geom
-            else:
-                # For polygons (building footprints), use centroid
-                return geom.centroid
-        
-        gdf['geometry'] = gdf.geometry.map(to_point)
+        # For polygons (building footprints), use centroid; a point's
+        # centroid is the point itself
+        gdf['geometry'] = shapely.centroid(gdf.geometry.values)
         
         return gdf
         
@@ -179,10 +178,11 @@ def filter_within_boundary(gdf: gpd.GeoDataFrame, boundary: Union[Polygon, Multi
         Filtered GeoDataFrame
     """
     try:
-        # Check which points are within the boundary
-        within_mask = gdf.geometry.within(boundary)
+        # Use the spatial index to test only points inside the boundary's
+        # bounding box; sorting keeps the original row order
+        within_idx = np.sort(gdf.sindex.query(boundary, predicate='contains'))
         
-        filtered_gdf = gdf[within_mask].copy()
+        filtered_gdf = gdf.iloc[within_idx].copy()
         
         logger.info(f"Filtered to {len(filtered_gdf)} stores within boundary")
         
@@ -252,8 +252,8 @@ def extract_store_info(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
         else:
             clean_data['name'] = ''
         
-        # Shop type (already created)
-        clean_data['shop_type'] = gdf['shop_type']
+        # Shop type (already created); categorical so filtering compares codes
+        clean_data['shop_type'] = gdf['shop_type'].astype('category')
         
         # Geometry
         clean_data['geometry'] = gdf['geometry']
@@ -308,7 +308,13 @@ def get_store_counts_by_type(stores_gdf: gpd.GeoDataFrame) -> Dict[str, int]:
         if stores_gdf is None or stores_gdf.empty:
             return {}
         
-        counts = stores_gdf['shop_type'].value_counts().to_dict()
+        # observed=True skips unused categories of a categorical column
+        counts = (
+            stores_gdf.groupby('shop_type', observed=True)
+            .size()
+            .sort_values(ascending=False)
+            .to_dict()
+        )
         
         return counts
         
@@ -5,39 +5,43 @@ This package contains helper modules for:
 - Input validation
 - Geometry processing
 - Map building and visualization
-"""
-
-from .validation import (
-    validate_city_name,
-    validate_state_name,
-    sanitize_input
-)
+- OpenStreetMap access
 
-from .geo_utils import (
-    calculate_distance,
-    get_bbox_from_gdf,
-    simplify_geometry
-)
+Submodules are imported on first attribute access, so importing
+utils.validation does not also load geopandas and folium.
+"""
 
-from .map_builder import (
-    create_base_map,
-    add_boundary_to_map,
-    add_stores_to_map
-)
+import importlib
 
-__all__ = [
+# Public name -> submodule that defines it
+_EXPORTS = {
     # Validation
-    'validate_city_name',
-    'validate_state_name',
-    'sanitize_input',
+    'validate_city_name': 'validation',
+    'validate_state_name': 'validation',
+    'sanitize_input': 'validation',
     
     # Geo utilities
-    'calculate_distance',
-    'get_bbox_from_gdf',
-    'simplify_geometry',
+    'calculate_distance': 'geo_utils',
+    'get_bbox_from_gdf': 'geo_utils',
+    'simplify_geometry': 'geo_utils',
     
     # Map building
-    'create_base_map',
-    'add_boundary_to_map',
-    'add_stores_to_map',
-]
\ No newline at end of file
+    'create_base_map': 'map_builder',
+    'add_boundary_to_map': 'map_builder',
+    'add_stores_to_map': 'map_builder',
+    
+    # OpenStreetMap
+    'get_osmnx': 'osm_utils',
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name: str):
+    """Import the submodule that defines a public name on first use."""
+    module_name = _EXPORTS.get(name)
+    
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    module = importlib.import_module(f".{module_name}", __name__)
+    return getattr(module, name)
@@ -7,13 +7,17 @@ including distance calculations and geometry manipulation.
 
 import logging
 from typing import Tuple, Optional, Union
+import numpy as np
 import geopandas as gpd
-from shapely.geometry import Point, Polygon, MultiPolygon
-from shapely.ops import unary_union
+import shapely
+from shapely.geometry import Point, Polygon, MultiPolygon, box
 import traceback
 
 logger = logging.getLogger(__name__)
 
+# Earth's radius in kilometers, used by every distance and radius helper
+EARTH_RADIUS_KM = 6371.0
+
 def calculate_distance(
     point1: Tuple[float, float],
     point2: Tuple[float, float]
@@ -33,9 +37,6 @@ def calculate_distance(
     lat1, lon1 = point1
     lat2, lon2 = point2
     
-    # Earth's radius in kilometers
-    R = 6371.0
-    
     # Convert to radians
     lat1_rad = radians(lat1)
     lon1_rad = radians(lon1)
@@ -49,7 +50,7 @@ def calculate_distance(
     a = sin(dlat / 2)**2 + cos(lat1_rad) * cos(lat2_rad) * sin(dlon / 2)**2
     c = 2 * atan2(sqrt(a), sqrt(1 - a))
     
-    distance = R * c
+    distance = EARTH_RADIUS_KM * c
     
     return round(distance, 2)
 
@@ -70,6 +71,58 @@ def get_bbox_from_gdf(gdf: gpd.GeoDataFrame) -> Tuple[float, float, float, float
         logger.error(f"Error getting bounding box: {e}")
         return (-180, -90, 180, 90)
     
+def get_point_coordinates(gdf: gpd.GeoDataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get latitude and longitude arrays for a GeoDataFrame of points.
+    
+    Uses the precomputed 'lat'/'lon' columns when present and falls back
+    to reading the geometries otherwise.
+    
+    Args:
+        gdf: GeoDataFrame with Point geometries in EPSG:4326
+        
+    Returns:
+        Tuple of (latitudes, longitudes) arrays
+    """
+    if 'lat' in gdf.columns and 'lon' in gdf.columns:
+        return gdf['lat'].to_numpy(), gdf['lon'].to_numpy()
+    
+    return gdf.geometry.y.to_numpy(), gdf.geometry.x.to_numpy()
+
+def downcast_numeric_columns(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+    """
+    Downcast float64 columns to float32 and int64 columns to int32.
+    
+    float32 keeps coordinates to roughly a metre, which is plenty for
+    display. Integer columns are only narrowed when every value fits, so
+    large identifiers such as OSM ids stay int64. The geometry column is
+    left untouched.
+    
+    Args:
+        gdf: GeoDataFrame to downcast
+        
+    Returns:
+        GeoDataFrame with narrowed numeric columns
+    """
+    if gdf is None or gdf.empty:
+        return gdf
+    
+    try:
+        int32 = np.iinfo(np.int32)
+        
+        for col in gdf.select_dtypes(include='float64').columns:
+            gdf[col] = gdf[col].astype('float32')
+        
+        for col in gdf.select_dtypes(include='int64').columns:
+            values = gdf[col]
+            if values.min() >= int32.min and values.max() <= int32.max:
+                gdf[col] = values.astype('int32')
+        
+        return gdf
+    except Exception as e:
+        logger.error(f"Error downcasting numeric columns: {e}")
+        return gdf
+
 def get_centroid(gdf: gpd.GeoDataFrame) -> Optional[Tuple[float, float]]:
     """
     Get centroid of a GeoDataFrame.
@@ -190,7 +243,7 @@ def merge_geometries(gdf: gpd.GeoDataFrame) -> Optional[Union[Polygon, MultiPoly
         if gdf is None or gdf.empty:
             return None
         
-        merged = unary_union(gdf.geometry)
+        merged = shapely.unary_union(gdf.geometry.values)
         
         # Ensure result is Polygon or MultiPolygon
         if isinstance(merged, (Polygon, MultiPolygon)):
@@ -203,6 +256,92 @@ def merge_geometries(gdf: gpd.GeoDataFrame) -> Optional[Union[Polygon, MultiPoly
         logger.error(f"Error merging geometries: {e}")
         return None
     
+def haversine_distances(
+    point: Tuple[float, float],
+    lats: np.ndarray,
+    lons: np.ndarray
+) -> np.ndarray:
+    """
+    Calculate Haversine distances from one point to many points.
+    
+    Vectorized counterpart of calculate_distance, rounded the same way.
+    
+    Args:
+        point: (latitude, longitude) tuple
+        lats: Array of latitudes
+        lons: Array of longitudes
+        
+    Returns:
+        Array of distances in kilometers
+    """
+    lat1 = np.radians(point[0])
+    lon1 = np.radians(point[1])
+    lat2 = np.radians(np.asarray(lats, dtype='float64'))
+    lon2 = np.radians(np.asarray(lons, dtype='float64'))
+    
+    a = np.sin((lat2 - lat1) / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    
+    return np.round(EARTH_RADIUS_KM * c, 2)
+
+def get_radius_bbox(
+    point: Tuple[float, float],
+    radius_km: float
+) -> Tuple[float, float, float, float]:
+    """
+    Get the lon/lat bounding box of a circle on the sphere.
+    
+    Every point within radius_km (great-circle distance) of the center
+    lies inside the returned box.
+    
+    Args:
+        point: (latitude, longitude) tuple of the center
+        radius_km: Radius in kilometers
+        
+    Returns:
+        Tuple of (minx, miny, maxx, maxy)
+    """
+    lat, lon = point
+    angle = radius_km / EARTH_RADIUS_KM
+    dlat = np.degrees(angle)
+    
+    # Longitude half-width of a spherical cap; the whole globe near the poles
+    cos_lat = np.cos(np.radians(lat))
+    if np.sin(angle) < cos_lat:
+        dlon = np.degrees(np.arcsin(np.sin(angle) / cos_lat))
+    else:
+        dlon = 180.0
+    
+    return (lon - dlon, max(lat - dlat, -90.0), lon + dlon, min(lat + dlat, 90.0))
+
+def find_stores_in_radius(
+    point: Tuple[float, float],
+    stores_gdf: gpd.GeoDataFrame,
+    radius_km: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find stores within a radius of a point.
+    
+    The stores' spatial index narrows the search to the radius' bounding
+    box, so Haversine distances are only computed for nearby candidates.
+    
+    Args:
+        point: (latitude, longitude) tuple
+        stores_gdf: GeoDataFrame with store locations
+        radius_km: Search radius in kilometers
+        
+    Returns:
+        Tuple of (positional indices, distances in km), ordered by position
+    """
+    # Distances are rounded to 0.01 km, so widen the box by half a step
+    candidates = np.sort(stores_gdf.sindex.query(box(*get_radius_bbox(point, radius_km + 0.005))))
+    
+    lats, lons = get_point_coordinates(stores_gdf)
+    distances = haversine_distances(point, lats[candidates], lons[candidates])
+    within = distances <= radius_km
+    
+    return candidates[within], distances[within]
+
 def find_nearest_store(
     point: Tuple[float, float],
     stores_gdf: gpd.GeoDataFrame
@@ -210,12 +349,15 @@ def find_nearest_store(
     """
     Find the nearest store to a given point.
     
+    The spatial index gives the nearest store in degrees; its Haversine
+    distance then bounds a radius search that finds the true nearest one.
+    
     Args:
         point: (latitude, longitude) tuple
         stores_gdf: GeoDataFrame with store locations
         
     Returns:
-        Tuple of (store_index, distance_km) or None if no stores
+        Tuple of (store position, distance_km) or None if no stores
     """
     try:
         if stores_gdf is None or stores_gdf.empty:
@@ -224,20 +366,17 @@ def find_nearest_store(
         # Create Point geometry
         point_geom = Point(point[1], point[0])  # Point(lon, lat)
         
-        # Calculate distances using Haversine for accuracy
-        distances = []
-        for idx, store in stores_gdf.iterrows():
-            store_lat = store.geometry.y
-            store_lon = store.geometry.x
-            dist = calculate_distance(point, (store_lat, store_lon))
-            distances.append((idx, dist))
+        lats, lons = get_point_coordinates(stores_gdf)
+        first_guess = stores_gdf.sindex.nearest(point_geom, return_all=False)[1][0]
+        bound_km = haversine_distances(point, lats[[first_guess]], lons[[first_guess]])[0]
         
-        # Find minimum
-        if not distances:
-            return None
+        positions, distances = find_stores_in_radius(point, stores_gdf, bound_km)
         
-        min_item = min(distances, key=lambda x: x[1])
-        return min_item
+        if len(positions) == 0:
+            return int(first_guess), float(bound_km)
+        
+        nearest = np.argmin(distances)
+        return int(positions[nearest]), float(distances[nearest])
         
     except Exception as e:
         logger.error(f"Error finding nearest store: {e}")
@@ -263,16 +402,8 @@ def count_stores_in_radius(
         if stores_gdf is None or stores_gdf.empty:
             return 0
         
-        # Count stores within radius using Haversine distance
-        count = 0
-        for idx, store in stores_gdf.iterrows():
-            store_lat = store.geometry.y
-            store_lon = store.geometry.x
-            dist = calculate_distance(point, (store_lat, store_lon))
-            if dist <= radius_km:
-                count += 1
-        
-        return count
+        positions, _ = find_stores_in_radius(point, stores_gdf, radius_km)
+        return len(positions)
         
     except Exception as e:
         logger.error(f"Error counting stores in radius: {e}")
@@ -354,7 +485,7 @@ def calculate_coverage_percentage(
         buffered_stores = buffer_geometry(stores_gdf, radius_meters)
         
         # Merge all buffers
-        merged_buffers = unary_union(buffered_stores.geometry)
+        merged_buffers = shapely.unary_union(buffered_stores.geometry.values)
         
         # Get city boundary as a proper Shapely geometry
         city_boundary_geom = boundary_gdf.geometry.iloc[0]
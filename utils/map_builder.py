@@ -5,26 +5,64 @@ Provides functions to create and customize Folium maps
 for visualizing city boundaries and grocery store locations.
 """
 
+import json
 import logging
 import traceback
 import sys
 from pathlib import Path
 from typing import Optional, List, Tuple
 import folium
-from folium.plugins import MarkerCluster
+from folium.plugins import FastMarkerCluster
 import geopandas as gpd
 from shapely.geometry import Polygon, MultiPolygon
 from branca.element import MacroElement
 from jinja2 import Template
 import geopandas as gpd
-from shapely.ops import unary_union
+import shapely
 
 # Add parent directory to path for config import
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from config import Config
+from utils.geo_utils import get_point_coordinates
 
 logger = logging.getLogger(__name__)
 
+# Leaflet callback that turns one row of store marker data
+# ([lat, lon, name, type code]) into a marker. Labels and colors are
+# looked up per type code so each row doesn't repeat them.
+STORE_MARKER_CALLBACK = Template("""
+function (row) {
+    var storeTypes = {{ store_types }};
+    var storeType = storeTypes[row[3]];
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {
+        radius: 6,
+        color: 'black',
+        weight: 2,
+        fill: true,
+        fillColor: storeType[1],
+        fillOpacity: 0.7
+    });
+    marker.bindPopup(
+        '<div style="font-family: Arial, sans-serif; min-width: 150px;">' +
+        '<h4 style="margin: 0 0 10px 0;">' + (row[2] || 'Unnamed Store') + '</h4>' +
+        '<p style="margin: 5px 0;"><b>Type:</b> ' + storeType[0] + '</p>' +
+        '</div>',
+        {maxWidth: 300}
+    );
+    marker.bindTooltip(row[2] || storeType[2]);
+    return marker;
+}
+""")
+
+# Popup for stores drawn as individual markers (clustering disabled); the
+# clustered markers build the same popup in STORE_MARKER_CALLBACK
+STORE_POPUP_HTML = (
+    '<div style="font-family: Arial, sans-serif; min-width: 150px;">'
+    '<h4 style="margin: 0 0 10px 0;">{name}</h4>'
+    '<p style="margin: 5px 0;"><b>Type:</b> {type_label}</p>'
+    '</div>'
+)
+
 def create_base_map(
     center: Optional[Tuple[float, float]] = None,
     zoom: Optional[int] = None
@@ -55,10 +93,36 @@ def create_base_map(
     
     return m
 
+def boundary_to_geojson(boundary_gdf: gpd.GeoDataFrame) -> str:
+    """
+    Serialize a city boundary to a GeoJSON string for Folium.
+    
+    Args:
+        boundary_gdf: GeoDataFrame with city boundary
+        
+    Returns:
+        GeoJSON string
+    """
+    # Create a copy to avoid modifying the original
+    boundary_copy = boundary_gdf.copy()
+
+    # Convert any datetime/timestamp columns to strings for JSON serialization
+    for col in boundary_copy.columns:
+        if col != 'geometry' and boundary_copy[col].dtype == 'datetime64[ns]':
+            boundary_copy[col] = boundary_copy[col].astype(str)
+        elif col != 'geometry' and hasattr(boundary_copy[col].iloc[0], 'isoformat'):
+            # Handle pandas Timestamp objects
+            boundary_copy[col] = boundary_copy[col].apply(
+                lambda x: x.isoformat() if hasattr(x, 'isoformat') else str(x)
+            )
+    
+    return boundary_copy.to_json()
+
 def add_boundary_to_map(
     map_obj: folium.Map,
     boundary_gdf: gpd.GeoDataFrame,
-    zoom_to_bounds: bool = True
+    zoom_to_bounds: bool = True,
+    boundary_geojson: Optional[str] = None
 ) -> folium.Map:
     """
     Add city boundary to a Folium map.
@@ -67,6 +131,8 @@ def add_boundary_to_map(
         map_obj: Folium Map object
         boundary_gdf: GeoDataFrame with city boundary
         zoom_to_bounds: Whether to zoom map to boundary extent
+        boundary_geojson: Precomputed GeoJSON for boundary_gdf, serialized
+                          here when not given
         
     Returns:
         Updated Folium Map object
@@ -76,21 +142,9 @@ def add_boundary_to_map(
             logger.warning("Empty boundary GeoDataFrame")
             return map_obj
         
-        # Create a copy to avoid modifying the original
-        boundary_copy = boundary_gdf.copy()
-
-        # Convert any datetime/timestamp columns to strings for JSON serialization
-        for col in boundary_copy.columns:
-            if col != 'geometry' and boundary_copy[col].dtype == 'datetime64[ns]':
-                boundary_copy[col] = boundary_copy[col].astype(str)
-            elif col != 'geometry' and hasattr(boundary_copy[col].iloc[0], 'isoformat'):
-                # Handle pandas Timestamp objects
-                boundary_copy[col] = boundary_copy[col].apply(
-                    lambda x: x.isoformat() if hasattr(x, 'isoformat') else str(x)
-                )
-        
         # Convert to GeoJSON
-        boundary_geojson = boundary_copy.to_json()
+        if boundary_geojson is None:
+            boundary_geojson = boundary_to_geojson(boundary_gdf)
         
         # Add boundary to map
         folium.GeoJson(
@@ -103,14 +157,14 @@ def add_boundary_to_map(
                 'fillOpacity': Config.BOUNDARY_FILL_OPACITY
             },
             tooltip=folium.Tooltip(
-                f"<b>{boundary_copy['name'].iloc[0]}, {boundary_copy['state'].iloc[0]}</b><br>"
-                f"Area: {boundary_copy['area_km2'].iloc[0]:.2f} km²"
+                f"<b>{boundary_gdf['name'].iloc[0]}, {boundary_gdf['state'].iloc[0]}</b><br>"
+                f"Area: {boundary_gdf['area_km2'].iloc[0]:.2f} km²"
             )
         ).add_to(map_obj)
         
         # Zoom to boundary
         if zoom_to_bounds:
-            bounds = boundary_copy.total_bounds
+            bounds = boundary_gdf.total_bounds
             map_obj.fit_bounds([
                 [bounds[1], bounds[0]],  # Southwest
                 [bounds[3], bounds[2]]   # Northeast
@@ -123,6 +177,48 @@ def add_boundary_to_map(
         logger.error(traceback.format_exc())
         return map_obj
     
+def build_store_marker_data(
+    stores_gdf: gpd.GeoDataFrame,
+    color_by_type: bool = True
+) -> Tuple[List[list], str]:
+    """
+    Build compact per-store marker rows and the callback that renders them.
+    
+    Each row only carries coordinates, the store name and an integer type
+    code; the type label, color and fallback tooltip are embedded once in
+    the callback. This keeps the data sent to the browser small for cities
+    with thousands of stores.
+    
+    Args:
+        stores_gdf: GeoDataFrame with store locations
+        color_by_type: Whether to color markers by store type
+        
+    Returns:
+        Tuple of ([lat, lon, name, type code] rows, JS callback source)
+    """
+    names = stores_gdf['name'].fillna('').astype(str).tolist()
+    type_codes, shop_types = stores_gdf['shop_type'].astype(str).factorize()
+    
+    store_types = [
+        [
+            shop_type.replace('_', ' ').title(),
+            Config.get_store_color(shop_type) if color_by_type else Config.DEFAULT_STORE_COLOR,
+            shop_type.title()
+        ]
+        for shop_type in shop_types
+    ]
+    
+    # Plain rounded floats keep the JSON payload small and serializable
+    # whatever precision the coordinate columns are stored at
+    lats, lons = get_point_coordinates(stores_gdf)
+    lats = lats.astype('float64').round(6).tolist()
+    lons = lons.astype('float64').round(6).tolist()
+    
+    rows = [list(row) for row in zip(lats, lons, names, type_codes.tolist())]
+    callback = STORE_MARKER_CALLBACK.render(store_types=json.dumps(store_types))
+    
+    return rows, callback
+
 def add_stores_to_map(
     map_obj: folium.Map,
     stores_gdf: gpd.GeoDataFrame,
@@ -146,42 +242,30 @@ def add_stores_to_map(
             logger.warning("Empty stores GeoDataFrame")
             return map_obj
         
-        # Create a copy to avoid modifying the original
-        stores_copy = stores_gdf.copy()
-        
-        # Convert any datetime/timestamp columns to strings for JSON serialization
-        for col in stores_copy.columns:
-            if col != 'geometry' and stores_copy[col].dtype == 'datetime64[ns]':
-                stores_copy[col] = stores_copy[col].astype(str)
-            elif col != 'geometry' and hasattr(stores_copy[col].iloc[0], 'isoformat'):
-                # Handle pandas Timestamp objects
-                try:
-                    stores_copy[col] = stores_copy[col].apply(
-                        lambda x: x.isoformat() if hasattr(x, 'isoformat') else str(x)
-                    )
-                except:
-                    pass
-        
-        # Create marker cluster if enabled
+        # Clustered markers are created in the browser from a single data
+        # array instead of one Python marker object per store
         if use_clusters and Config.USE_MARKER_CLUSTERS:
-            marker_cluster = MarkerCluster(
+            marker_data, marker_callback = build_store_marker_data(stores_gdf, color_by_type)
+            
+            FastMarkerCluster(
+                data=marker_data,
+                callback=marker_callback,
                 name='Grocery Stores',
                 overlay=True,
                 control=True
             ).add_to(map_obj)
-            parent = marker_cluster
-        else:
-            parent = map_obj
+            
+            return map_obj
+        
+        # Pull the columns out once instead of boxing every row into a Series
+        lats, lons = get_point_coordinates(stores_gdf)
+        names = stores_gdf['name'].to_numpy(object) if 'name' in stores_gdf.columns else [None] * len(stores_gdf)
+        shop_types = stores_gdf['shop_type'].astype(str).to_numpy(object)
         
         # Add each store as a marker
-        for idx, store in stores_copy.iterrows():
-            # Get coordinates
-            lat = store.geometry.y
-            lon = store.geometry.x
-            
-            # Get store info
-            name = store.get('name', 'Unnamed Store')
-            shop_type = store.get('shop_type', 'unknown')
+        for lat, lon, name, shop_type in zip(lats.tolist(), lons.tolist(), names, shop_types):
+            if not isinstance(name, str) or not name:
+                name = None
             
             # Get color
             if color_by_type:
@@ -190,14 +274,10 @@ def add_stores_to_map(
                 color = Config.DEFAULT_STORE_COLOR
             
             # Create popup content
-            popup_html = f"""
-            <div style="font-family: Arial, sans-serif; min-width: 150px;">
-                <h4 style="margin: 0 0 10px 0;">{name if name else 'Unnamed Store'}</h4>
-                <p style="margin: 5px 0;">
-                    <b>Type:</b> {shop_type.replace('_', ' ').title()}
-                </p>
-            </div>
-            """
+            popup_html = STORE_POPUP_HTML.format(
+                name=name if name else 'Unnamed Store',
+                type_label=shop_type.replace('_', ' ').title()
+            )
             
             # Create marker
             folium.CircleMarker(
@@ -210,7 +290,7 @@ def add_stores_to_map(
                 fillColor=color,
                 fillOpacity=0.7,
                 weight=2
-            ).add_to(parent)
+            ).add_to(map_obj)
         
         return map_obj
         
@@ -244,7 +324,7 @@ def add_walkability_buffers_to_map(
         buffer_copy = walkability_gdf.copy()
         
         # Merge all buffers into a single geometry for cleaner visualization
-        merged_geometry = unary_union(buffer_copy.geometry)
+        merged_geometry = shapely.unary_union(buffer_copy.geometry.values)
         
         # Create a GeoDataFrame with the merged geometry
         merged_gdf = gpd.GeoDataFrame(
@@ -466,7 +546,8 @@ def create_full_map(
     analysis_point: Optional[Tuple[float, float]] = None,
     analysis_radius: float = 1.0,
     walkability_gdf: Optional[gpd.GeoDataFrame] = None,
-    walkability_radius: float = 1.0
+    walkability_radius: float = 1.0,
+    boundary_geojson: Optional[str] = None
 ) -> folium.Map:
     """
     Create a complete map with boundary, stores, and optional analysis point.
@@ -480,6 +561,7 @@ def create_full_map(
         analysis_radius: Radius for accessibility analysis in km
         walkability_gdf: Optional GeoDataFrame with walkability buffer geometries
         walkability_radius: Radius used for walkability buffers in km
+        boundary_geojson: Optional precomputed GeoJSON for boundary_gdf
         
     Returns:
         Complete Folium Map object
@@ -494,8 +576,10 @@ def create_full_map(
                 logger.error("Geometry must be Polygon or MultiPolygon")
                 raise TypeError("Geometry must be Polygon or MultiPolygon")
 
-            centroid = geom.centroid
-            center = (centroid.y, centroid.x)  # (lat, lon)
+            # The map is fitted to the boundary extent afterwards, so the
+            # middle of the bounding box is a good enough starting center
+            minx, miny, maxx, maxy = boundary_gdf.total_bounds
+            center = ((miny + maxy) / 2, (minx + maxx) / 2)  # (lat, lon)
             zoom = Config.CITY_ZOOM_LEVEL
         else:
             center = None
@@ -506,7 +590,7 @@ def create_full_map(
         
         # Add boundary
         if boundary_gdf is not None and not boundary_gdf.empty:
-            m = add_boundary_to_map(m, boundary_gdf)
+            m = add_boundary_to_map(m, boundary_gdf, boundary_geojson=boundary_geojson)
         
         # Add walkability buffers FIRST (so they appear under everything else)
         if walkability_gdf is not None and not walkability_gdf.empty:
@@ -0,0 +1,23 @@
+"""
+OpenStreetMap helpers for the Food Desert Mapper.
+
+Provides shared access to osmnx, which both the city boundary and
+grocery store fetchers use to query OpenStreetMap.
+"""
+
+def get_osmnx():
+    """
+    Import and configure osmnx on first use.
+    
+    osmnx is slow to import, so it is only loaded once data is fetched.
+    
+    Returns:
+        The configured osmnx module
+    """
+    import osmnx as ox
+    
+    # Configure osmnx settings
+    ox.settings.log_console = False
+    ox.settings.use_cache = True
+    
+    return ox
@@ -8,6 +8,18 @@ for city names, states, and other text fields.
 import re
 from typing import Any
 
+# Allow letters, spaces, hyphens, apostrophes, and periods
+# This covers most city names like "St. Louis", "O'Fallon", "Winston-Salem"
+CITY_NAME_PATTERN = re.compile(r"^[a-zA-Z\s\-'.]+$")
+
+# Allow letters, spaces, hyphens, and periods
+STATE_NAME_PATTERN = re.compile(r"^[a-zA-Z\s\-.]+$")
+
+# Allow letters, numbers, underscores
+STORE_TYPE_PATTERN = re.compile(r"^[a-zA-Z0-9_]+$")
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
 def validate_city_name(city: str) -> bool:
     """
     Validate that a city name is acceptable.
@@ -40,11 +52,7 @@ def validate_city_name(city: str) -> bool:
     if not any(c.isalpha() for c in city):
         return False
     
-    # Allow letters, spaces, hyphens, apostrophes, and periods
-    # This covers most city names like "St. Louis", "O'Fallon", "Winston-Salem"
-    pattern = r"^[a-zA-Z\s\-'.]+$"
-    
-    if not re.match(pattern, city):
+    if not CITY_NAME_PATTERN.match(city):
         return False
     
     return True
@@ -81,10 +89,7 @@ def validate_state_name(state: str) -> bool:
     if not any(c.isalpha() for c in state):
         return False
     
-    # Allow letters, spaces, hyphens, and periods
-    pattern = r"^[a-zA-Z\s\-.]+$"
-    
-    if not re.match(pattern, state):
+    if not STATE_NAME_PATTERN.match(state):
         return False
     
     return True
@@ -106,7 +111,7 @@ def sanitize_input(text: str) -> str:
     text = text.strip()
     
     # Replace multiple spaces with single space
-    text = re.sub(r'\s+', ' ', text)
+    text = WHITESPACE_PATTERN.sub(' ', text)
     
     # Title case for proper formatting (e.g., "new york" -> "New York")
     text = text.title()
@@ -178,10 +183,7 @@ def validate_store_type(store_type: str) -> bool:
     if len(store_type) > 50:
         return False
     
-    # Allow letters, numbers, underscores
-    pattern = r"^[a-zA-Z0-9_]+$"
-    
-    if not re.match(pattern, store_type):
+    if not STORE_TYPE_PATTERN.match(store_type):
         return False
     
     return True